@@ -0,0 +1,79 @@
+"""큐 기반 비동기 로거: 요청 스레드는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 기록
+
+run.log 에는 JSON-lines ({"ts", "level", "msg"}) 로 쓰고, echo=True 면 표준출력에도 "[LOG] ..." 로 출력한다.
+"""
+import datetime
+import json
+import queue
+import random
+import sys
+import threading
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+_STOP = object()
+
+
+class AsyncLogger:
+    def __init__(self, path="run.log", level="info", debug_sample_rate=1.0, echo=True,
+                 batch_size=256, flush_interval=0.5):
+        self.min_level = LEVELS.get(level, LEVELS["info"])
+        self.debug_sample_rate = debug_sample_rate  # sample=True 로 남긴 부피 큰 메시지 중 실제로 남길 비율
+        self.echo = echo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.file = open(path, "a") if path else None
+        self.queue = queue.SimpleQueue()
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name="async-log", daemon=True)
+        self.thread.start()
+
+    def log(self, msg, level="info", sample=False):
+        """요청 스레드에서 호출: 레벨/샘플링 판단 후 큐에 넣고 바로 반환
+
+        sample=True 는 후보 목록, LLM 원문 응답처럼 부피가 큰 메시지용 (debug_sample_rate 만큼만 남김).
+        """
+        if LEVELS.get(level, LEVELS["info"]) < self.min_level:
+            return
+        if sample and self.debug_sample_rate < 1.0 and random.random() >= self.debug_sample_rate:
+            self.dropped += 1
+            return
+        self.queue.put((datetime.datetime.now().isoformat(), level, str(msg)))
+
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is _STOP for entry in batch)
+            self._write([entry for entry in batch if entry is not _STOP])
+            if stop:
+                return
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            if self.file:
+                self.file.write("".join(json.dumps({"ts": ts, "level": level, "msg": msg}, ensure_ascii=False) + "\n"
+                                        for ts, level, msg in batch))
+                self.file.flush()
+            if self.echo:
+                sys.stdout.write("".join(f"[LOG] {msg}\n" for _, _, msg in batch))
+                sys.stdout.flush()
+        except (OSError, ValueError):
+            pass
+
+    def close(self, timeout=2.0):
+        """남은 메시지를 모두 기록하고 파일을 닫는다 (atexit cleanup 에서 호출)"""
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        if self.file:
+            self.file.close()
@@ -0,0 +1,172 @@
+"""Solver 를 HTTP 없이 직접 구동하는 오프라인 벤치마크
+
+words.txt 의 모든 정답(또는 seed 로 뽑은 표본)에 대해 문제를 풀고
+추측 횟수 분포, 실패율, 턴별 지연시간(p50/p95/p99), 전체 시간을 JSON 으로 출력한다.
+snowflake.cortex.complete 대신 정답 코드를 돌려주는 로컬 stub 을 사용한다 (오류/지연 주입 가능).
+
+사용법: python benchmark.py --sample 500 --seed 0 --out bench.json
+       python benchmark.py --sample 200 --strategy heuristic,entropy,lookahead  (전략 비교)
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+import scoring
+from grader import compute_feedback, load_words, verbalize_feedback
+
+
+class StubCortex:
+    """complete() 대역: 현재 정답 기준의 올바른 코드를 LLM 응답 형식으로 반환"""
+
+    def __init__(self, error_rate=0.0, latency=0.0, failure_rate=0.0, seed=0):
+        self.error_rate = error_rate  # 틀린 코드를 돌려줄 확률
+        self.failure_rate = failure_rate  # 예외를 던질 확률
+        self.latency = latency  # 호출당 지연(초)
+        self.rng = random.Random(seed)
+        self.secret = None
+        self.calls = 0
+
+    def complete(self, model=None, prompt=None, options=None, session=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            raise RuntimeError("injected Cortex failure")
+
+        content = prompt[-1]["content"]
+        # 배치 프롬프트: "번호. Guess: xxxxx" 항목마다 "번호: 코드" 한 줄
+        items = re.findall(r"^(\d+)\. Guess: (\w{5})", content, re.M)
+        if items:
+            return "\n".join(f"{number}: {self._code(guess)}" for number, guess in items)
+
+        # 프롬프트 마지막 "Guess: xxxxx" 가 해석 대상
+        guess = re.findall(r"Guess: (\w{5})", content)[-1]
+        return f"Therefore, the feedback code is:\n{self._code(guess)}"
+
+    def _code(self, guess):
+        code = "".join(map(str, compute_feedback(self.secret, guess)))
+        if self.rng.random() < self.error_rate:
+            code = "".join(self.rng.choice("012") for _ in range(5))
+        return code
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def play(solver, problem_id, secret, words, max_turns):
+    """한 문제를 풀고 (추측 횟수 또는 None, 턴별 지연시간 목록) 반환"""
+    solver.start_problem(problem_id, words)
+    feedback = None
+    latencies = []
+    for turn in range(1, max_turns + 1):
+        start = time.perf_counter()
+        solver.add_feedback(problem_id, feedback)
+        guess = solver.choose_next_guess(problem_id, turn)
+        latencies.append(time.perf_counter() - start)
+        if guess == secret:
+            return turn, latencies
+        feedback = verbalize_feedback(secret, guess, compute_feedback(secret, guess))
+    return None, latencies
+
+
+def run_benchmark(solver, secrets, words, stub, max_turns=20):
+    guess_counts = []
+    failures = 0
+    latencies = []
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for i, secret in enumerate(secrets):
+        stub.secret = secret
+        try:
+            turns, turn_latencies = play(solver, f"bench-{i}", secret, words, max_turns)
+        except Exception:
+            turns, turn_latencies = None, []
+        latencies.extend(turn_latencies)
+        if turns is None:
+            failures += 1
+        else:
+            guess_counts.append(turns)
+    wall_time = time.perf_counter() - start
+    cpu_time = time.process_time() - cpu_start
+
+    return {
+        "problems": len(secrets),
+        "solved": len(guess_counts),
+        "failure_rate": failures / len(secrets) if secrets else 0.0,
+        "mean_guesses": sum(guess_counts) / len(guess_counts) if guess_counts else None,
+        "max_guesses": max(guess_counts) if guess_counts else None,
+        "guess_distribution": {str(k): guess_counts.count(k) for k in sorted(set(guess_counts))},
+        "turns": len(latencies),
+        "turn_latency_ms": {
+            "mean": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": 1000 * percentile(latencies, 50),
+            "p95": 1000 * percentile(latencies, 95),
+            "p99": 1000 * percentile(latencies, 99),
+            "max": 1000 * max(latencies) if latencies else 0.0,
+        },
+        "llm_calls": stub.calls,
+        "wall_time_s": wall_time,
+        "cpu_time_s": cpu_time,
+        "cpu_ms_per_problem": 1000 * cpu_time / len(secrets) if secrets else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay secrets through Solver in-process")
+    parser.add_argument("--sample", type=int, default=0, help="number of secrets to sample (0 = all words)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=20)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="probability the stub returns a wrong code")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="probability the stub raises")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds slept per stub call")
+    parser.add_argument("--force-llm", action="store_true", help="always call the (stub) LLM instead of the rule parser")
+    parser.add_argument("--strategy", default=None,
+                        help="scoring strategy, or a comma-separated list to compare (heuristic,entropy,lookahead)")
+    parser.add_argument("--label", default="", help="free-form label stored in the report")
+    parser.add_argument("--out", default=None, help="write the JSON report to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep solver logging")
+    args = parser.parse_args()
+
+    import team19
+    solver = team19.solver
+    stub = StubCortex(args.llm_error_rate, args.llm_latency, args.llm_failure_rate, args.seed)
+    solver.cortex.complete_fn = stub.complete
+    if args.force_llm:
+        solver.rule_confidence_threshold = float("inf")
+    if not args.verbose:
+        solver._log = solver.cortex.log = lambda msg, level="info", sample=False: None
+
+    solver.warm_up()  # 단어 목록/엔진 준비 시간은 wall_time 에서 제외
+    words = load_words()
+    secrets = random.Random(args.seed).sample(words, args.sample) if args.sample else words
+    if args.strategy and "," in args.strategy:
+        # 같은 정답 표본으로 전략별 평균 추측 횟수와 CPU 비용 비교
+        report = {"strategies": {}}
+        for name in args.strategy.split(","):
+            solver.strategy = scoring.get_strategy(name)
+            stub.calls = 0
+            report["strategies"][name] = run_benchmark(solver, secrets, words, stub, args.max_turns)
+        report["summary"] = {name: {"mean_guesses": r["mean_guesses"], "failure_rate": r["failure_rate"],
+                                    "cpu_ms_per_problem": r["cpu_ms_per_problem"]}
+                             for name, r in report["strategies"].items()}
+    else:
+        if args.strategy:
+            solver.strategy = scoring.get_strategy(args.strategy)
+        report = run_benchmark(solver, secrets, words, stub, args.max_turns)
+    report["config"] = {k: v for k, v in vars(args).items() if k not in ("out", "verbose")}
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
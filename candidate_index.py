@@ -0,0 +1,118 @@
+"""original_candidates 위의 비트셋 인덱스 (위치별 글자 비트셋 + 글자별 최소 개수 비트셋)
+
+후보 집합은 파이썬 정수 비트마스크로 표현한다 (i번째 비트 = words[i]).
+"""
+import sys
+from collections import Counter
+
+
+def _bits_to_int(bits):
+    # bits[i] == ord("1") 이면 i번째 비트 설정
+    return int(bytes(bits[::-1]), 2) if bits else 0
+
+
+class CandidateIndex:
+    def __init__(self, words):
+        # 문제마다 복사하지 않고 모든 문제가 공유하는 단어 테이블
+        self.words = [sys.intern(w) for w in words]
+        self.index = {w: i for i, w in enumerate(self.words)}
+        n = len(self.words)
+
+        valid = bytearray(b"0" * n)
+        position_bits = [{} for _ in range(5)]
+        count_bits = {}  # letter -> [None, >=1, >=2, ...]
+        for i, word in enumerate(self.words):
+            word = word.lower()
+            if len(word) != 5:
+                continue
+            valid[i] = ord("1")
+            for pos, ch in enumerate(word):
+                position_bits[pos].setdefault(ch, bytearray(b"0" * n))[i] = ord("1")
+            for ch, count in Counter(word).items():
+                levels = count_bits.setdefault(ch, [None])
+                while len(levels) <= count:
+                    levels.append(bytearray(b"0" * n))
+                for c in range(1, count + 1):
+                    levels[c][i] = ord("1")
+
+        self.all_mask = _bits_to_int(valid)
+        self.position = [{ch: _bits_to_int(bits) for ch, bits in pos.items()} for pos in position_bits]
+        self.min_count = {ch: [self.all_mask] + [_bits_to_int(b) for b in levels[1:]]
+                          for ch, levels in count_bits.items()}
+        self.valid_words = self.words_of(self.all_mask)  # 새 문제의 초기 후보 목록 (읽기 전용으로 공유)
+        # (guess, code) -> 제약 마스크: 같은 단어 목록의 문제들이 같은 추측/피드백이면 한 번만 계산
+        self.constraint_cache = {}
+        self.constraint_cache_size = 4096
+
+    def at_least(self, letter, count):
+        levels = self.min_count.get(letter, [self.all_mask])
+        return levels[count] if count < len(levels) else 0
+
+    def exactly(self, letter, count):
+        return self.at_least(letter, count) & ~self.at_least(letter, count + 1)
+
+    def constraint_mask(self, guess, feedback_code):
+        """(guess, feedback_code) 와 일치하는 단어 비트마스크 (compute_actual_feedback(word, guess) == feedback_code 인 단어들과 같은 결과)"""
+        key = (guess, feedback_code)
+        mask = self.constraint_cache.get(key)
+        if mask is None:
+            mask = self._constraint_mask(guess, feedback_code)
+            if len(self.constraint_cache) >= self.constraint_cache_size:
+                self.constraint_cache.clear()
+            self.constraint_cache[key] = mask
+        return mask
+
+    def _constraint_mask(self, guess, feedback_code):
+        guess = guess.lower()
+        if len(guess) != 5 or len(feedback_code) != 5 or not set(feedback_code) <= set("012"):
+            return 0
+
+        mask = self.all_mask
+        marked = Counter()  # 글자별 2/1 개수 = 정답에 최소 이만큼 존재
+        zero_letters = set()  # 0 이 나온 글자 = 정답의 개수가 정확히 marked 만큼
+        for pos, (ch, code) in enumerate(zip(guess, feedback_code)):
+            at = self.position[pos].get(ch, 0)
+            if code == "2":
+                mask &= at
+                marked[ch] += 1
+                continue
+            mask &= ~at
+            if code == "1":
+                # 노랑은 왼쪽부터 배정되므로 같은 글자의 0 뒤에 1 이 올 수 없다
+                if ch in zero_letters:
+                    return 0
+                marked[ch] += 1
+            else:
+                zero_letters.add(ch)
+
+        for ch in set(guess):
+            if ch in zero_letters:
+                mask &= self.exactly(ch, marked[ch])
+            else:
+                mask &= self.at_least(ch, marked[ch])
+        return mask
+
+    def filter(self, mask, guess, feedback_code):
+        return mask & self.constraint_mask(guess, feedback_code)
+
+    def mask_of(self, words):
+        bits = bytearray(b"0" * len(self.words))
+        for w in words:
+            i = self.index.get(w)
+            if i is not None:
+                bits[i] = ord("1")
+        return _bits_to_int(bits)
+
+    def words_of(self, mask):
+        """비트마스크에 해당하는 단어 목록 (원래 순서 유지)"""
+        bits = bin(mask)[:1:-1]
+        result = []
+        i = bits.find("1")
+        while i != -1:
+            result.append(self.words[i])
+            i = bits.find("1", i + 1)
+        return result
+
+    def position_letters(self, mask):
+        """mask 안의 단어들이 각 위치에서 가질 수 있는 글자 집합 목록"""
+        return [{ch for ch, bits in pos.items() if bits & mask} for pos in self.position]
@@ -0,0 +1,122 @@
+"""Snowflake Cortex complete() 세션 풀 (호출별 deadline, 재시도, hedged 요청)"""
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class CortexPool:
+    def __init__(self, session_factory, complete_fn, size=4, timeout=4.0, hedge_after=1.5,
+                 max_retries=1, log=None):
+        self.session_factory = session_factory
+        self.complete_fn = complete_fn
+        self.size = size
+        self.timeout = timeout
+        self.hedge_after = hedge_after  # 첫 시도가 이 시간(초) 안에 끝나지 않으면 중복 요청, 0 이면 사용 안 함
+        self.max_retries = max_retries
+        self.log = log or (lambda msg, level="info": print(msg))
+
+        self.idle = queue.Queue()
+        self.sessions = []
+        self.opening = 0  # 연결 중인 세션 수 (size 계산에 포함)
+        self.lock = threading.Lock()
+        # hedge 요청과 아직 끝나지 않은(timeout 난) 호출까지 수용
+        self.executor = ThreadPoolExecutor(max_workers=size * 2, thread_name_prefix="cortex")
+
+        self.calls = 0
+        self.hedges = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    def _acquire(self, deadline):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        # 자리만 lock 안에서 예약하고 (수 초 걸리는) 연결은 밖에서: 다른 호출과 stats() 가 기다리지 않게
+        with self.lock:
+            reserved = len(self.sessions) + self.opening < self.size
+            if reserved:
+                self.opening += 1
+        if reserved:
+            try:
+                session = self.session_factory()
+            except BaseException:
+                with self.lock:
+                    self.opening -= 1
+                raise
+            with self.lock:
+                self.opening -= 1
+                self.sessions.append(session)
+            return session
+        return self.idle.get(timeout=max(0.0, deadline - time.monotonic()))
+
+    def _call(self, deadline, kwargs):
+        session = self._acquire(deadline)
+        start = time.monotonic()
+        try:
+            with self.lock:
+                self.calls += 1
+            return self.complete_fn(session=session, **kwargs)
+        finally:
+            self.log(f"[CORTEX] complete() took {time.monotonic() - start:.3f}s", "info")
+            # 늦게 끝난 호출이라도 세션은 풀로 돌려준다
+            self.idle.put(session)
+
+    def complete(self, timeout=None, **kwargs):
+        """complete(model=..., prompt=..., options=...) 를 deadline 안에 실행, 실패 시 마지막 예외를 다시 던진다"""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        last_error = TimeoutError("Cortex call timed out")
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self.lock:
+                    self.retries += 1
+            pending = {self.executor.submit(self._call, deadline, kwargs)}
+            hedged = not self.hedge_after
+
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                wait_for = remaining if hedged else min(remaining, self.hedge_after)
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        last_error = e
+                        self.log(f"[CORTEX] attempt {attempt + 1} failed: {e}", "warning")
+
+                if not done and not hedged:
+                    # 꼬리 지연: 다른 세션으로 같은 요청을 한 번 더 보내고 먼저 끝난 결과 사용
+                    hedged = True
+                    with self.lock:
+                        self.hedges += 1
+                    self.log(f"[CORTEX] hedging after {self.hedge_after:.2f}s", "warning")
+                    pending.add(self.executor.submit(self._call, deadline, kwargs))
+
+            if time.monotonic() >= deadline:
+                with self.lock:
+                    self.timeouts += 1
+                last_error = TimeoutError(f"Cortex call exceeded {timeout or self.timeout:.2f}s deadline")
+                break
+
+        raise last_error
+
+    def warm_up(self):
+        """세션 하나를 미리 열어 둔다 (첫 호출이 연결 시간을 기다리지 않게)"""
+        self.idle.put(self._acquire(time.monotonic() + self.timeout))
+
+    def stats(self):
+        return {"sessions": len(self.sessions), "calls": self.calls, "hedges": self.hedges,
+                "retries": self.retries, "timeouts": self.timeouts}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        for session in self.sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
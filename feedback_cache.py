@@ -0,0 +1,147 @@
+"""(guess, verbal feedback) -> 피드백 코드 LRU 캐시 (JSON-lines 파일로 재시작 후에도 유지 가능)
+
+파일 기록은 AsyncLogger 처럼 큐에 넣고 백그라운드 스레드가 한 번 열어 둔 append 핸들로 모아서 쓴다
+(요청 스레드와 다른 요청의 get() 이 디스크 쓰기를 기다리지 않게).
+"""
+import json
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+
+def make_key(guess, verbal_feedback):
+    """캐시 키: 대소문자/공백만 정규화
+
+    normalize_feedback 은 탐욕적 정규식(correct.*position)으로 문장 사이를 지워버려
+    서로 다른 피드백이 같은 문자열이 될 수 있으므로 키로 쓰지 않는다.
+    """
+    return guess.lower(), " ".join(verbal_feedback.lower().split())
+
+
+_STOP = object()
+
+
+class FeedbackCache:
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.writer = None
+        if path:
+            self._load()
+            self._start_writer()
+
+    def _start_writer(self):
+        self.queue = queue.SimpleQueue()
+        self.file = open(self.path, "a")
+        self.writer = threading.Thread(target=self._run, name="feedback-cache-writer", daemon=True)
+        self.writer.start()
+
+    def after_fork(self):
+        """prefork 워커에서 호출: 기록 스레드는 fork 로 넘어오지 않으므로 새로 띄운다"""
+        if self.path:
+            self._start_writer()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(record is _STOP for record in batch)
+            try:
+                self.file.write("".join(json.dumps(record) + "\n" for record in batch if record is not _STOP))
+                self.file.flush()
+            except (OSError, ValueError):
+                pass
+            if stop:
+                return
+
+    def _append(self, key, code):
+        if self.writer is not None:
+            guess, feedback = key
+            self.queue.put({"guess": guess, "feedback": feedback, "code": code})
+
+    def close(self, timeout=2.0):
+        """남은 기록을 모두 쓰고 파일을 닫는다"""
+        if self.writer is None:
+            return
+        self.queue.put(_STOP)
+        self.writer.join(timeout)
+        self.file.close()
+        self.writer = None
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        lines = 0
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    key = make_key(record["guess"], record["feedback"])
+                except (ValueError, KeyError):
+                    continue
+                lines += 1
+                if record["code"] is None:
+                    # discard() 기록
+                    self.entries.pop(key, None)
+                    continue
+                self.entries[key] = record["code"]
+                self.entries.move_to_end(key)
+                if len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        # 중복/만료된 줄이 많이 쌓였으면 현재 내용으로 다시 쓴다
+        if lines > 2 * len(self.entries):
+            self._rewrite()
+
+    def _rewrite(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for (guess, feedback), code in self.entries.items():
+                f.write(json.dumps({"guess": guess, "feedback": feedback, "code": code}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        with self.lock:
+            code = self.entries.get(key)
+            if code is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return code
+
+    def put(self, key, code):
+        with self.lock:
+            self.entries[key] = code
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        self._append(key, code)
+
+    def discard(self, key):
+        """잘못된 것으로 밝혀진 해석 제거 (다음에는 다시 해석한다)"""
+        with self.lock:
+            removed = self.entries.pop(key, None) is not None
+        if removed:
+            self._append(key, None)  # _load 에서 null 은 삭제로 처리
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,212 @@
+"""추측 x 정답 피드백 패턴 행렬 엔진 (numpy 필요, 없으면 비활성화)"""
+import hashlib
+import os
+import tempfile
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 Solver는 기존 순수 파이썬 경로를 사용
+    np = None
+
+NUM_PATTERNS = 243  # 3^5
+ALL_CORRECT = NUM_PATTERNS - 1  # "22222"
+_WEIGHTS = (81, 27, 9, 3, 1)
+
+
+def code_to_int(code):
+    """'01220' 같은 피드백 코드를 0..242 정수로 변환 (첫 글자가 최상위 자리)"""
+    return int(code, 3)
+
+
+def int_to_code(value):
+    """0..242 정수를 5자리 피드백 코드 문자열로 변환"""
+    digits = []
+    for weight in _WEIGHTS:
+        digits.append(str(value // weight))
+        value %= weight
+    return "".join(digits)
+
+
+def word_list_key(words):
+    """단어 목록(순서 포함)의 해시, 캐시 파일 이름으로 사용"""
+    return hashlib.sha256("\n".join(words).encode()).hexdigest()[:16]
+
+
+def _save_atomic(path, array):
+    # 다른 워커가 반쯤 쓰인 파일을 매핑하지 않도록 임시 파일에 쓴 뒤 교체
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def encode_words(words):
+    """단어 목록을 (n, 5) uint8 배열(a=0..z=25)로 인코딩"""
+    raw = "".join(words).lower().encode("ascii")
+    return (np.frombuffer(raw, dtype=np.uint8).reshape(-1, 5) - ord("a")).astype(np.uint8)
+
+
+def compute_patterns(guess_codes, secret_codes):
+    """인코딩된 추측들과 정답들 사이의 피드백 패턴 (len(guess), len(secret)) uint8 행렬 계산
+
+    compute_actual_feedback 과 같은 규칙: 초록(2)을 먼저 처리하고, 노랑(1)은 왼쪽부터
+    정답에 남은 글자 수만큼만 부여한다.
+    """
+    # 위치별 초록 여부 (G, S), 정답별 글자 수 (S, 26)
+    green = [guess_codes[:, i, None] == secret_codes[None, :, i] for i in range(5)]
+    secret_counts = np.zeros((len(secret_codes), 26), dtype=np.int8)
+    for i in range(5):
+        np.add.at(secret_counts, (np.arange(len(secret_codes)), secret_codes[:, i]), 1)
+    patterns = np.zeros(green[0].shape, dtype=np.uint8)
+
+    for i in range(5):
+        # 정답 중 아직 초록으로 소모되지 않은 같은 글자 수
+        remaining = secret_counts[:, guess_codes[:, i]].T - green[i]
+        # 같은 글자가 왼쪽에서 이미 노랑을 가져간 횟수 (초록이 아닌 위치만)
+        prior = np.zeros_like(remaining)
+        for j in range(5):
+            if j == i:
+                continue
+            # 추측 안에 같은 글자가 반복되는 행만 보정
+            rows = np.flatnonzero(guess_codes[:, i] == guess_codes[:, j])
+            if not len(rows):
+                continue
+            remaining[rows] -= green[j][rows]
+            if j < i:
+                prior[rows] += ~green[j][rows]
+        yellow = ~green[i] & (remaining > prior)
+        patterns += (green[i] * np.uint8(2) + yellow) * np.uint8(_WEIGHTS[i])
+
+    return patterns
+
+
+def pattern_entropies(matrix, guess_idx, cand_idx, block_size=256):
+    """여러 추측의 엔트로피를 한 번에 계산 (243개 패턴에 대한 bincount 히스토그램)"""
+    n = len(cand_idx)
+    result = np.zeros(len(guess_idx))
+    if n <= 1:
+        return result
+
+    # H = log2(n) - sum(c * log2(c)) / n, c*log2(c) 는 미리 표로 만들어 둔다
+    counts_range = np.arange(n + 1, dtype=np.float64)
+    xlogx = np.zeros(n + 1)
+    xlogx[1:] = counts_range[1:] * np.log2(counts_range[1:])
+    offsets = (np.arange(block_size, dtype=np.intp) * NUM_PATTERNS)[:, None]
+
+    for start in range(0, len(guess_idx), block_size):
+        rows = matrix[np.ix_(guess_idx[start:start + block_size], cand_idx)]
+        b = len(rows)
+        counts = np.bincount((rows + offsets[:b]).ravel(), minlength=b * NUM_PATTERNS)
+        result[start:start + b] = np.log2(n) - xlogx[counts.reshape(b, NUM_PATTERNS)].sum(axis=1) / n
+    return result
+
+
+class FeedbackMatrix:
+    """word_list 전체에 대한 피드백 패턴을 미리 계산해 두고 필터링/점수 계산을 배열 조회로 처리"""
+
+    def __init__(self, words, matrix, cache_prefix=None):
+        self.words = list(words)
+        self.index = {w: i for i, w in enumerate(self.words)}
+        self.matrix = matrix  # matrix[guess_idx, secret_idx] = 패턴 코드
+        self.cache_prefix = cache_prefix
+        self._first_turn = None
+
+    @classmethod
+    def build(cls, words, block_size=256):
+        codes = encode_words(words)
+        n = len(codes)
+        matrix = np.empty((n, n), dtype=np.uint8)
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            matrix[start:stop] = compute_patterns(codes[start:stop], codes)
+        return cls(words, matrix)
+
+    @classmethod
+    def open_cached(cls, words, cache_dir):
+        """cache_dir 의 <해시>.matrix.npy 를 읽기 전용 mmap 으로 연다 (없으면 만들어서 저장)
+
+        mmap 이므로 복사 없이 열리고, 같은 파일을 여는 여러 서버 프로세스가 페이지 캐시를 공유한다.
+        """
+        prefix = os.path.join(cache_dir, word_list_key(words))
+        matrix_path = prefix + ".matrix.npy"
+        if not os.path.exists(matrix_path):
+            os.makedirs(cache_dir, exist_ok=True)
+            _save_atomic(matrix_path, cls.build(words).matrix)
+
+        matrix = np.load(matrix_path, mmap_mode="r")
+        if matrix.shape != (len(words), len(words)):
+            raise ValueError(f"feedback matrix shape {matrix.shape} does not match {len(words)} words")
+        return cls(words, matrix, cache_prefix=prefix)
+
+    @property
+    def matrix_path(self):
+        return self.cache_prefix + ".matrix.npy" if self.cache_prefix else None
+
+    def first_turn_ranking(self):
+        """전체 단어 목록 기준 첫 턴 엔트로피 순위 [(word, entropy)] (캐시가 있으면 파일에서 읽음)"""
+        if self._first_turn is None:
+            path = self.cache_prefix + ".first_turn.npy" if self.cache_prefix else None
+            if path and os.path.exists(path):
+                scores = np.load(path, mmap_mode="r")
+            else:
+                all_idx = np.arange(len(self.words))
+                scores = self.entropies(all_idx, all_idx)
+                if path:
+                    _save_atomic(path, scores)
+            self._first_turn = ranking(self.words, scores)
+        return self._first_turn
+
+    def indices(self, words):
+        """단어들의 인덱스 배열, 엔진에 없는 단어가 하나라도 있으면 None"""
+        try:
+            return np.fromiter((self.index[w] for w in words), dtype=np.intp, count=len(words))
+        except KeyError:
+            return None
+
+    def entropy(self, guess, candidates):
+        """guess 로 추측했을 때 candidates 에 대한 피드백 분포의 엔트로피, 처리 불가 시 None"""
+        guess_idx = self.index.get(guess)
+        cand_idx = self.indices(candidates)
+        if guess_idx is None or cand_idx is None:
+            return None
+        return float(self.entropies(np.array([guess_idx]), cand_idx)[0])
+
+    def entropies(self, guess_idx, cand_idx):
+        return pattern_entropies(self.matrix, guess_idx, cand_idx)
+
+    def rank_guesses(self, guesses, candidates, deadline=None, chunk_size=1024):
+        """guesses 를 candidates 기준 엔트로피 내림차순으로 정렬한 [(word, entropy)], 처리 불가 시 None
+
+        deadline(time.monotonic 기준)이 있으면 guesses 앞쪽부터 chunk 단위로 평가하다가
+        시간이 다 되면 그때까지 평가한 단어들만 반환한다 (최소 한 chunk 는 평가).
+        """
+        guess_idx = self.indices(guesses)
+        cand_idx = self.indices(candidates)
+        if guess_idx is None or cand_idx is None:
+            return None
+        if deadline is None:
+            return ranking(guesses, self.entropies(guess_idx, cand_idx))
+
+        chunks = []
+        for start in range(0, len(guess_idx), chunk_size):
+            if chunks and time.monotonic() >= deadline:
+                break
+            chunks.append(self.entropies(guess_idx[start:start + chunk_size], cand_idx))
+        scores = np.concatenate(chunks) if chunks else np.zeros(0)
+        return ranking(guesses[:len(scores)], scores)
+
+
+def ranking(guesses, scores):
+    """점수 내림차순 [(word, score)] (같은 점수는 원래 순서 유지)"""
+    order = np.argsort(-scores, kind="stable")
+    return [(guesses[i], float(scores[i])) for i in order]
+
+
+def available():
+    return np is not None
+
@@ -0,0 +1,125 @@
+"""규칙 기반 verbal feedback 해석기 (LLM 없이 grader 문장 템플릿과 묶음 표현 처리)"""
+import re
+
+# 글자 언급: 'a', "a", ‘a’ 등
+LETTER_RE = re.compile(r"['\"‘’“”]([a-z])['\"‘’“”]")
+
+# 한 문장 안에서 상태가 바뀔 수 있는 지점
+CLAUSE_SPLIT_RE = re.compile(r",?\s+(?:but|while|whereas)\s+|,\s*and\s+|;\s*|,\s*(?=['\"‘“])")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+# 순서대로 검사 (예: "not in the word" 는 "in the word" 보다 먼저, "wrong position" 은 "wrong" 보다 먼저)
+STATUS_PATTERNS = [
+    ("1", re.compile(r"(wrong|incorrect|different|another) (position|spot|place|location|slot)|misplaced|somewhere|elsewhere"
+                     r"|not in (the|its|their) (right|correct)|yellow")),
+    ("0", re.compile(r"not in the (word|target|answer|solution|secret)|(do|does|did)(n't| not) (appear|exist|occur)"
+                     r"|(aren't|isn't|are not|is not) (in|present|part)|not present|absent|nowhere|\bwrong\b|\bgr[ae]y\b"
+                     r"|\bno\b.*\b(match|where)|\bnothing\b|\bnone\b")),
+    ("2", re.compile(r"(correct|right|exact|proper)\w* (position|spot|place|location|slot)|in place|\bgreen\b|\bcorrect\b")),
+    ("1", re.compile(r"in the (word|target|answer|solution|secret)|present|appears?|contains?|included")),
+]
+OTHERS_RE = re.compile(r"\b(others?|the rest|rest of|remaining|all other|every other|everything else|nothing else|none of the|all (the )?letters)\b")
+
+
+def classify(text):
+    """문장 조각의 상태 코드('0'/'1'/'2'), 판단할 수 없으면 None"""
+    for status, pattern in STATUS_PATTERNS:
+        if pattern.search(text):
+            return status
+    return None
+
+
+def _split_clauses(verbal_feedback):
+    for sentence in SENTENCE_SPLIT_RE.split(verbal_feedback.lower()):
+        for clause in CLAUSE_SPLIT_RE.split(sentence):
+            clause = clause.strip(" .!?")
+            if clause:
+                yield clause
+
+
+def parse_feedback_rules(guess, verbal_feedback):
+    """verbal feedback 을 (5자리 코드, 신뢰도 0..1) 로 해석
+
+    같은 글자의 k번째 언급은 guess 안의 k번째 같은 글자 위치에 대응시킨다 (grader 는 위치 순서로 문장을 만든다).
+    """
+    guess = guess.lower()
+    if len(guess) != 5 or not verbal_feedback:
+        return "00000", 0.0
+
+    code = [None] * 5
+    confidence = 1.0
+    others_status = None
+    absent_letters = set()
+    pending = []  # 상태가 아직 안 나온 글자 목록 ("'c', 'r', and 's' do not appear" 처럼 나뉜 경우)
+    last_slots = []
+
+    def assign(letters, status):
+        """글자들을 guess 위치에 배정하고 배정된 위치 목록을 반환"""
+        nonlocal confidence
+        assigned = []
+        for letter in letters:
+            if status == "0":
+                absent_letters.add(letter)
+            slots = [i for i, ch in enumerate(guess) if ch == letter and code[i] is None]
+            if slots:
+                code[slots[0]] = status
+                assigned.append(slots[0])
+            elif letter in guess:
+                # 이미 배정된 글자를 다시 언급: 같은 상태면 무시, 다르면 모순
+                if all(code[i] != status for i, ch in enumerate(guess) if ch == letter):
+                    confidence -= 0.5
+            else:
+                confidence -= 0.3
+        return assigned
+
+    for clause in _split_clauses(verbal_feedback):
+        if "except" in clause:
+            head, tail = clause.split("except", 1)
+            others_status = classify(head) or others_status
+            letters = LETTER_RE.findall(tail)
+            status = classify(tail)
+            if status is None:
+                # "All letters are wrong except 'a'" : 위치 정보 없이 존재만 알려줌
+                status = "1" if others_status == "0" else None
+                confidence -= 0.3
+            if status is not None:
+                last_slots = assign(pending + letters, status)
+                pending = []
+            continue
+
+        letters = LETTER_RE.findall(clause)
+        status = classify(clause)
+
+        if not letters:
+            if status is not None and OTHERS_RE.search(clause):
+                others_status = status
+            elif status is not None:
+                # "'a' is in the word but in the wrong position" 의 뒷부분: 바로 앞에서 배정한 위치의 상태를 보정
+                for i in last_slots:
+                    code[i] = status
+            continue
+
+        if status is None:
+            pending.extend(letters)
+            continue
+
+        last_slots = assign(pending + letters, status)
+        pending = []
+
+    if pending:
+        confidence -= 0.3 * len(pending)
+
+    for i, ch in enumerate(guess):
+        if code[i] is not None:
+            continue
+        if others_status is not None:
+            code[i] = others_status
+        elif ch in absent_letters:
+            # 같은 글자가 없다고 했으면 나머지 중복 위치도 0
+            code[i] = "0"
+            confidence -= 0.1
+        else:
+            code[i] = "0"
+            confidence -= 0.25
+
+    return "".join(code), max(0.0, min(1.0, confidence))
@@ -1,5 +1,9 @@
 import requests
 from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import random
+import threading
 import time
 
 STUDENTS = {
@@ -113,7 +117,221 @@ def run_for_team(team_name, base_url):
     print(f"[{team_name}] Finished.")
 
 
+# 부하 테스트용 지연시간 히스토그램 구간 (ms)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class LoadStats:
+    """엔드포인트별 지연시간/오류 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.solved = 0
+        self.failed = 0
+        self.guesses = []
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(seconds * 1000)
+
+    def error(self, endpoint):
+        with self.lock:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def finish(self, guess_count):
+        with self.lock:
+            if guess_count is None:
+                self.failed += 1
+            else:
+                self.solved += 1
+                self.guesses.append(guess_count)
+
+    def report(self, elapsed):
+        endpoints = {}
+        for endpoint, values in self.latencies.items():
+            ordered = sorted(values)
+            histogram = {}
+            for bound in LATENCY_BUCKETS_MS:
+                histogram[f"<={bound}"] = sum(1 for v in ordered if v <= bound)
+            histogram["+Inf"] = len(ordered)
+            endpoints[endpoint] = {
+                "requests": len(ordered),
+                "p50_ms": ordered[len(ordered) // 2],
+                "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                "p99_ms": ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))],
+                "max_ms": ordered[-1],
+                "histogram_ms": histogram,
+            }
+        return {
+            "problems": self.solved + self.failed,
+            "solved": self.solved,
+            "failed": self.failed,
+            "elapsed_s": elapsed,
+            "throughput_problems_per_s": (self.solved + self.failed) / elapsed if elapsed else 0.0,
+            "mean_guesses": sum(self.guesses) / len(self.guesses) if self.guesses else None,
+            "errors": self.errors,
+            "endpoints": endpoints,
+        }
+
+
+_thread_local = threading.local()
+
+
+def _session():
+    # 스레드마다 keep-alive 연결을 재사용하는 Session 하나
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+def _post(stats, endpoint, url, payload):
+    start = time.time()
+    try:
+        r = _session().post(url, json=payload, timeout=10)
+        r.raise_for_status()
+    except Exception:
+        stats.error(endpoint)
+        raise
+    finally:
+        stats.record(endpoint, time.time() - start)
+    return r
+
+
+def _end_problem(stats, base_url, problem_id):
+    # 서버가 문제 상태를 바로 정리하도록 알림 (/end_problem 이 없는 서버는 무시)
+    try:
+        _post(stats, "/end_problem", f"{base_url}/end_problem", {"problem_id": problem_id})
+    except Exception:
+        pass
+
+
+_words_keys = {}  # base_url -> 서버가 돌려준 단어 목록 해시
+
+
+def _start_problem(stats, base_url, problem_id, candidate_words, by_key=True):
+    """등록된 목록이면 words_key 만 보내고, 서버가 모르면(409) 전체 목록을 보낸다"""
+    url = f"{base_url}/start_problem"
+    words_key = _words_keys.get(base_url) if by_key else None
+    if words_key:
+        start = time.time()
+        try:
+            r = _session().post(url, json={"problem_id": problem_id, "words_key": words_key}, timeout=10)
+        finally:
+            stats.record("/start_problem", time.time() - start)
+        if r.status_code == 200:
+            return
+    r = _post(stats, "/start_problem", url, {"problem_id": problem_id, "candidate_words": candidate_words})
+    if r.headers.get("Content-Type") == "application/json":
+        _words_keys[base_url] = r.json().get("words_key")
+
+
+def run_load_problem(base_url, problem_id, secret, candidate_words, stats, max_turns=20, by_key=True):
+    try:
+        _start_problem(stats, base_url, problem_id, candidate_words, by_key)
+        feedback = None
+        for turn in range(1, max_turns + 1):
+            payload = {"problem_id": problem_id, "verbal_feedback": feedback, "turn": turn}
+            guess = _post(stats, "/guess", f"{base_url}/guess", payload).json()["guess"]
+            if guess == secret:
+                stats.finish(turn)
+                _end_problem(stats, base_url, problem_id)
+                return
+            feedback = verbalize_feedback(secret, guess, compute_feedback(secret, guess))
+    except Exception:
+        pass
+    stats.finish(None)
+
+
+def run_load(base_url, problems=200, concurrency=32, ramp=0.0, seed=0, by_key=True):
+    """서로 다른 problem_id/정답 problems 개를 concurrency 개씩 동시에 실행
+
+    ramp 초 동안 시작 시점을 나눠서 동시 실행 수를 점진적으로 올린다.
+    """
+    all_words = load_words()
+    rng = random.Random(seed)
+    secrets = [rng.choice(all_words) for _ in range(problems)]
+    stats = LoadStats()
+
+    def task(i):
+        if ramp and i < concurrency:
+            time.sleep(ramp * i / concurrency)
+        run_load_problem(base_url, f"load-{seed}-{i}", secrets[i], all_words, stats, by_key=by_key)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(task, range(problems)))
+    return stats.report(time.time() - start)
+
+
+def run_batch(base_url, problems=200, batch_size=64, seed=0, by_key=True):
+    """problems 개를 batch_size 개씩 묶어 /guess_batch 한 번에 모든 문제의 한 턴을 진행"""
+    all_words = load_words()
+    rng = random.Random(seed)
+    secrets = [rng.choice(all_words) for _ in range(problems)]
+    stats = LoadStats()
+
+    start = time.time()
+    for offset in range(0, problems, batch_size):
+        active = {}  # problem_id -> [secret, turn, feedback]
+        for i in range(offset, min(offset + batch_size, problems)):
+            problem_id = f"batch-{seed}-{i}"
+            try:
+                _start_problem(stats, base_url, problem_id, all_words, by_key)
+                active[problem_id] = [secrets[i], 1, None]
+            except Exception:
+                stats.finish(None)
+
+        while active:
+            items = [{"problem_id": pid, "verbal_feedback": fb, "turn": turn}
+                     for pid, (_, turn, fb) in active.items()]
+            try:
+                results = _post(stats, "/guess_batch", f"{base_url}/guess_batch", {"items": items}).json()["guesses"]
+            except Exception:
+                for _ in active:
+                    stats.finish(None)
+                break
+
+            for result in results:
+                problem_id = result["problem_id"]
+                secret, turn, _ = active[problem_id]
+                guess = result.get("guess")
+                if guess == secret:
+                    stats.finish(turn)
+                    _end_problem(stats, base_url, problem_id)
+                elif guess is None or turn >= 20:
+                    stats.finish(None)
+                else:
+                    active[problem_id] = [secret, turn + 1,
+                                          verbalize_feedback(secret, guess, compute_feedback(secret, guess))]
+                    continue
+                del active[problem_id]
+    return stats.report(time.time() - start)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Evaluate student servers, or load-test one")
+    parser.add_argument("--load", action="store_true", help="run concurrent load mode instead of evaluation")
+    parser.add_argument("--url", default=STUDENTS["team19"])
+    parser.add_argument("--problems", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which workers start")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=0, help="with --load: step this many problems per /guess_batch request")
+    parser.add_argument("--full-upload", action="store_true", help="always send candidate_words instead of words_key")
+    args = parser.parse_args()
+
+    if args.load and args.batch:
+        report = run_batch(args.url, args.problems, args.batch, args.seed, not args.full_upload)
+        print(json.dumps(report, indent=2))
+        return
+
+    if args.load:
+        report = run_load(args.url, args.problems, args.concurrency, args.ramp, args.seed, not args.full_upload)
+        print(json.dumps(report, indent=2))
+        return
+
     with ThreadPoolExecutor(max_workers=4) as executor:
         for team, url in STUDENTS.items():
             executor.submit(run_for_team, team, url)
@@ -0,0 +1,75 @@
+"""동시에 들어온 LLM 피드백 해석 요청을 모아 한 번의 complete() 로 처리
+
+Cortex 세션이 남아 있으면 모인 만큼 바로 보내고, 모두 사용 중이면 그동안 들어온 요청을
+다음 호출 하나로 묶는다 (혼자 들어온 요청에 지연을 더하지 않는다).
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class FeedbackBatcher:
+    def __init__(self, batch_fn, max_batch=16, window=0.0, concurrency=4):
+        self.batch_fn = batch_fn  # [(guess, verbal_feedback)] -> [code 또는 None]
+        self.max_batch = max_batch
+        self.window = window  # 첫 요청 뒤 다른 요청을 더 기다리는 시간(초), 0 이면 기다리지 않음
+        self.queue = queue.SimpleQueue()  # 항목: [(pair, future), ...] (submit_many 는 한 번에 넣는다)
+        self.slots = threading.Semaphore(concurrency)  # 동시에 진행 중인 호출 수 (Cortex 세션 풀 크기)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm-batch")
+        self.pending = []
+        self.batches = 0
+        self.items = 0
+        self.thread = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, guess, verbal_feedback):
+        """해석 요청을 큐에 넣고 Future 반환 (결과는 코드 또는 None)"""
+        return self.submit_many([(guess, verbal_feedback)])[0]
+
+    def submit_many(self, pairs):
+        """여러 요청을 한꺼번에 넣어 같은 호출로 묶이게 한다"""
+        entries = [(pair, Future()) for pair in pairs]
+        self.queue.put(entries)
+        return [future for _, future in entries]
+
+    def _drain(self, timeout=None):
+        deadline = time.monotonic() + (timeout or 0)
+        while len(self.pending) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                self.pending.extend(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _run(self):
+        while True:
+            if not self.pending:
+                self.pending.extend(self.queue.get())
+            self._drain(self.window)
+            # 빈 세션을 기다리는 동안 들어온 요청도 이번 호출에 합친다
+            self.slots.acquire()
+            self._drain()
+            batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+            self.batches += 1
+            self.items += len(batch)
+            self.executor.submit(self._complete, batch)
+
+    def _complete(self, batch):
+        try:
+            codes = self.batch_fn([pair for pair, _ in batch])
+        except Exception as e:
+            codes = [e] * len(batch)
+        finally:
+            self.slots.release()
+        for (_, future), code in zip(batch, codes):
+            if isinstance(code, Exception):
+                future.set_exception(code)
+            else:
+                future.set_result(code)
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,81 @@
+"""턴 단위 계측: 카운터, 지연시간 히스토그램, Prometheus text format 출력"""
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.help = {}
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+
+    @contextmanager
+    def span(self, name, **labels):
+        """with 블록 실행 시간을 name 히스토그램에 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self, gauges=None):
+        """Prometheus text exposition format 문자열"""
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{_labels(dict(labels))} {value}")
+
+            for (name, labels), hist in sorted(self.histograms.items()):
+                header(name, "histogram")
+                labels = dict(labels)
+                for bound, count in zip(self.buckets, hist):
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {hist[-1]}")
+                lines.append(f"{name}_sum{_labels(labels)} {hist[-2]}")
+                lines.append(f"{name}_count{_labels(labels)} {hist[-1]}")
+
+        for name, value in sorted((gauges or {}).items()):
+            header(name, "gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,81 @@
+"""처음 몇 턴의 결정 트리(opening book) 오프라인 생성/로드
+
+트리 노드: {"g": 추측 단어, "r": {피드백 코드: 자식 노드}}
+후보가 2개 이하로 줄어든 분기와 "22222" 는 저장하지 않는다 (실시간 로직이 처리).
+
+사용법: python opening_book.py --depth 3 --out opening_book.json
+"""
+import argparse
+import json
+import os
+import time
+
+import feedback_matrix
+from feedback_matrix import ALL_CORRECT, int_to_code, np
+
+
+def best_guess(engine, cand_idx, pool_idx):
+    """엔트로피 + 정답 확률(1/n) 보너스가 가장 큰 추측 (pool 전체 평가)"""
+    scores = engine.entropies(pool_idx, cand_idx)
+    scores[np.isin(pool_idx, cand_idx)] += 1 / len(cand_idx)
+    return int(pool_idx[np.argmax(scores)])
+
+
+def build_node(engine, guess_idx, cand_idx, pool_idx, depth):
+    node = {"g": engine.words[guess_idx]}
+    if depth <= 1:
+        return node
+
+    patterns = np.asarray(engine.matrix[guess_idx, cand_idx])
+    replies = {}
+    for pattern in np.unique(patterns):
+        members = cand_idx[patterns == pattern]
+        if pattern == ALL_CORRECT or len(members) <= 2:
+            continue
+        reply = best_guess(engine, members, pool_idx)
+        replies[int_to_code(int(pattern))] = build_node(engine, reply, members, pool_idx, depth - 1)
+    node["r"] = replies
+    return node
+
+
+def build_book(engine, depth=3, starter=None):
+    all_idx = np.arange(len(engine.words))
+    if starter is None:
+        starter = engine.first_turn_ranking()[0][0]
+    tree = build_node(engine, engine.index[starter], all_idx, all_idx, depth)
+    return {"words_key": feedback_matrix.word_list_key(engine.words), "depth": depth, "tree": tree}
+
+
+def save_book(book, path):
+    with open(path, "w") as f:
+        json.dump(book, f, separators=(",", ":"))
+
+
+def load_book(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the opening book for a word list")
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--depth", type=int, default=3, help="number of turns covered by the book")
+    parser.add_argument("--starter", default=None, help="first guess (default: best first-turn entropy)")
+    parser.add_argument("--out", default="opening_book.json")
+    parser.add_argument("--cache", default=os.environ.get("FEEDBACK_MATRIX_CACHE", ".feedback_cache"))
+    args = parser.parse_args()
+
+    if not feedback_matrix.available():
+        raise SystemExit("opening book builder requires numpy")
+
+    words = [line.strip() for line in open(args.words) if len(line.strip()) == 5]
+    start = time.time()
+    engine = feedback_matrix.FeedbackMatrix.open_cached(words, args.cache)
+    book = build_book(engine, depth=args.depth, starter=args.starter)
+    save_book(book, args.out)
+    print(f"Opening book ({args.depth} turns, starter '{book['tree']['g']}') written to {args.out} "
+          f"in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""ProcessPoolExecutor 기반 병렬 추측 점수 계산
+
+워커는 시작할 때 미리 띄워 두고, 피드백 행렬은 각 워커가 같은 캐시 파일을 mmap 으로 열어 공유한다.
+턴마다 워커로 보내는 것은 행렬 파일 경로, 추측 범위, 후보 인덱스 배열뿐이다.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import feedback_matrix
+from feedback_matrix import np
+
+_matrices = {}  # (워커 프로세스 안) 행렬 파일 경로 -> mmap
+
+
+def _matrix(path):
+    matrix = _matrices.get(path)
+    if matrix is None:
+        matrix = _matrices[path] = np.load(path, mmap_mode="r")
+    return matrix
+
+
+def _warm_up(path):
+    _matrix(path)
+    return os.getpid()
+
+
+def _score_range(path, start, stop, cand_idx):
+    return feedback_matrix.pattern_entropies(_matrix(path), np.arange(start, stop), cand_idx)
+
+
+def _score_indices(path, guess_idx, cand_idx):
+    return feedback_matrix.pattern_entropies(_matrix(path), guess_idx, cand_idx)
+
+
+class ParallelScorer:
+    def __init__(self, workers):
+        self.workers = workers
+        # 로그/LLM batcher/Cortex 스레드가 돌고 있는 서버 프로세스를 그대로 fork 하면 잡힌 락 때문에 워커가 멈출 수 있어
+        # spawn 으로 띄운다 (워커는 행렬 파일 경로만 받는다). forkserver 와 달리 프로세스 전역 상태가 없어서
+        # prefork 워커가 fork 된 뒤에 각자 만들어도 된다
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def warm_up(self, engine):
+        """워커 프로세스를 모두 띄우고 행렬 파일을 미리 매핑"""
+        pids = set(self.executor.map(_warm_up, [engine.matrix_path] * (self.workers * 2)))
+        return len(pids)
+
+    def rank_guesses(self, engine, guesses, candidates, deadline=None):
+        """FeedbackMatrix.rank_guesses 와 같은 결과를 워커들에 나눠 계산, 처리 불가 시 None
+
+        deadline 이 지나면 그때까지 끝난 (앞쪽) 구간만 사용한다.
+        """
+        path = engine.matrix_path
+        guess_idx = engine.indices(guesses)
+        cand_idx = engine.indices(candidates)
+        if path is None or guess_idx is None or cand_idx is None:
+            return None
+
+        bounds = np.linspace(0, len(guess_idx), self.workers + 1).astype(int)
+        if len(guess_idx) == len(engine.words) and np.array_equal(guess_idx, np.arange(len(guess_idx))):
+            # 전체 단어 목록이면 인덱스 대신 범위만 보낸다
+            futures = [self.executor.submit(_score_range, path, lo, hi, cand_idx)
+                       for lo, hi in zip(bounds[:-1], bounds[1:])]
+        else:
+            futures = [self.executor.submit(_score_indices, path, guess_idx[lo:hi], cand_idx)
+                       for lo, hi in zip(bounds[:-1], bounds[1:])]
+        if deadline is not None:
+            wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            # 앞쪽부터 연속으로 끝난 구간만 사용 (guesses 는 우선순위 순서), 최소 첫 구간은 기다린다
+            used = 1
+            while used < len(futures) and futures[used].done():
+                used += 1
+            for future in futures[used:]:
+                future.cancel()
+            futures = futures[:used]
+
+        scores = np.concatenate([f.result() for f in futures])
+        return feedback_matrix.ranking(guesses[:len(scores)], scores)
+
+    def close(self):
+        # 워커에 종료를 알릴 때까지 기다린다 (바로 os._exit 하는 prefork 워커에서 고아 프로세스가 남지 않게)
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,196 @@
+"""SERVER_MODE=prefork : SO_REUSEPORT 로 같은 포트를 듣는 워커 프로세스 N 개 (GIL 을 넘어 코어 수만큼 처리)
+
+- 부모가 warm_up() 으로 단어 목록/인덱스/행렬 엔진/opening book 을 만든 뒤 fork 하므로 워커들은 copy-on-write 로 공유
+- 문제 상태는 problem_id 해시로 정한 워커(owner) 한 곳에만 있다. 커널이 연결을 다른 워커에 넘기면
+  그 워커가 owner 의 내부 포트 (127.0.0.1:internal_base + 워커 번호) 로 요청을 그대로 전달한다
+- 리슨 소켓은 부모가 모두 만들어 두고 워커가 죽으면 같은 번호로 다시 띄운다 (그동안 온 연결은 소켓 큐에서 기다림)
+- /metrics 와 /warm_up 은 요청을 받은 워커 자신의 것
+"""
+import gc
+import http.client
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+
+def owner(problem_id, workers):
+    """problem_id 를 맡는 워커 번호 (프로세스마다 달라지는 hash() 대신 crc32)"""
+    return zlib.crc32(str(problem_id).encode()) % workers
+
+
+class ReusePortServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # 워커가 재시작되는 동안에도 연결이 큐에서 기다릴 수 있게
+
+    def server_bind(self):
+        # 워커마다 자기 소켓을 같은 포트에 bind, 커널이 연결을 워커들에 나눠 준다
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+class InternalServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class Router:
+    """워커 하나의 라우팅 정보와 다른 워커들로의 keep-alive 연결 (스레드별)"""
+
+    def __init__(self, worker, workers, internal_base):
+        self.worker = worker
+        self.workers = workers
+        self.internal_base = internal_base
+        self.local = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefork-forward")
+
+    def owner(self, problem_id):
+        return owner(problem_id, self.workers)
+
+    def is_local(self, problem_id):
+        return self.owner(problem_id) == self.worker
+
+    def forward(self, worker, path, body):
+        """worker 의 내부 포트로 POST 를 보내 (status, body, content_type) 반환
+
+        재사용하던 연결이 끊겨 있으면 (owner 가 재시작된 경우 등) 새 연결로 한 번만 다시 보낸다.
+        그 밖의 오류 (timeout 등) 는 연결을 버리고 그대로 던진다.
+        """
+        conns = self.local.__dict__.setdefault("conns", {})
+        for attempt in range(2):
+            conn = conns.get(worker)
+            reused = conn is not None
+            if conn is None:
+                conn = conns[worker] = http.client.HTTPConnection("127.0.0.1", self.internal_base + worker, timeout=30)
+            try:
+                conn.request("POST", path, body, {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                return response.status, response.read(), response.getheader("Content-Type")
+            except Exception as e:
+                # timeout 등으로 반쯤 쓴 연결은 다시 쓸 수 없으므로 (CannotSendRequest) 어떤 오류든 버린다
+                conn.close()
+                del conns[worker]
+                if attempt or not reused or not isinstance(e, ConnectionError):
+                    raise
+
+    def _forward_batch(self, worker, items):
+        status, body, _ = self.forward(worker, "/guess_batch", json.dumps({"items": items}).encode())
+        if status != 200:
+            return [{"problem_id": item["problem_id"], "error": f"worker {worker} returned HTTP {status}"}
+                    for item in items]
+        return json.loads(body)["guesses"]
+
+    def guess_batch(self, items, local_fn):
+        """/guess_batch 항목을 owner 별로 나눠 다른 워커 몫은 동시에 전달하고, 자기 몫은 local_fn 으로 처리"""
+        groups = {}
+        for i, item in enumerate(items):
+            groups.setdefault(self.owner(item["problem_id"]), []).append(i)
+        futures = {worker: self.executor.submit(self._forward_batch, worker, [items[i] for i in positions])
+                   for worker, positions in groups.items() if worker != self.worker}
+        results = [None] * len(items)
+        if self.worker in groups:
+            positions = groups[self.worker]
+            for i, result in zip(positions, local_fn([items[i] for i in positions])):
+                results[i] = result
+        for worker, future in futures.items():
+            for i, result in zip(groups[worker], future.result()):
+                results[i] = result
+        return results
+
+
+def _stop(signum, frame):
+    raise SystemExit(0)
+
+
+def _run_worker(worker, workers, public, internal, internal_base, handler, solver, llm):
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C 는 부모가 받아 워커들에 SIGTERM 을 보낸다
+    for i in range(workers):
+        if i != worker:
+            public[i].socket.close()
+            internal[i].socket.close()
+    solver.after_fork()
+    if llm:
+        try:
+            solver.warm_up(llm=True)
+        except Exception as e:
+            print(f"[LOG] Worker {worker} LLM warm-up failed ({e}), continuing")
+
+    # 내부 포트로 온 요청은 owner 가 보낸 것이므로 다시 전달하지 않는다 (handler.router 가 None)
+    internal[worker].RequestHandlerClass = handler
+    threading.Thread(target=internal[worker].serve_forever, name="prefork-internal", daemon=True).start()
+    public[worker].RequestHandlerClass = type(handler.__name__, (handler,),
+                                              {"router": Router(worker, workers, internal_base)})
+    print(f"[LOG] Worker {worker} (pid {os.getpid()}) serving")
+    public[worker].serve_forever()
+
+
+def serve(handler, solver, port, workers, internal_base=None, llm=True):
+    """부모: 공유 상태를 준비하고 리슨 소켓을 모두 만든 뒤 워커를 fork 하고 감시한다 (돌아오지 않음)"""
+    internal_base = internal_base or port + 1
+    print(f"[LOG] Warm-up before fork: {solver.warm_up()}")
+    # 워커가 스레드를 새로 만들기 전에 부모의 로그 스레드를 비워서 멈춘다 (fork 시점에 잡힌 락이 없게)
+    solver.logger.close()
+    solver.feedback_cache.close()  # 피드백 캐시 기록 스레드도 마찬가지 (워커가 after_fork 에서 새로 띄움)
+    public = [ReusePortServer(("0.0.0.0", port), handler) for _ in range(workers)]
+    internal = [InternalServer(("127.0.0.1", internal_base + i), handler) for i in range(workers)]
+    # 워밍업으로 만든 객체는 GC 가 건드리지 않게 해서 참조 카운트 외에는 페이지가 복사되지 않도록
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(worker):
+        sys.stdout.flush()  # 버퍼에 남은 출력이 워커마다 한 번씩 더 찍히지 않게
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(worker, workers, public, internal, internal_base, handler, solver, llm)
+            except SystemExit:
+                pass
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                solver.cleanup()
+                os._exit(code)
+        children[pid] = worker
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for worker in range(workers):
+        spawn(worker)
+    if solver.parallel_scorer is not None:
+        # 워커들이 각자 풀을 만들었으므로 부모 풀은 필요 없다
+        solver.parallel_scorer.close()
+        solver.parallel_scorer = None
+    print(f"Student server running on port {port} (prefork, {workers} workers, internal ports "
+          f"{internal_base}-{internal_base + workers - 1})…")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        worker = children.pop(pid, None)
+        if worker is not None and not stopping:
+            print(f"[LOG] Worker {worker} (pid {pid}) exited with status {status}, restarting")
+            spawn(worker)
@@ -0,0 +1,85 @@
+"""문제별 상태: 단어 목록은 공유 CandidateIndex 에 한 번만 두고, 문제는 후보 비트마스크만 가진다"""
+import time
+
+
+class UnknownProblem(KeyError):
+    """시작되지 않았거나 이미 제거(evict)된 problem_id"""
+
+    def __init__(self, problem_id, evicted_reason=None):
+        super().__init__(problem_id)
+        self.problem_id = problem_id
+        self.evicted_reason = evicted_reason  # None 이면 처음부터 없던 문제
+
+    def __str__(self):
+        if self.evicted_reason:
+            return f"problem {self.problem_id!r} was evicted ({self.evicted_reason})"
+        return f"unknown problem {self.problem_id!r}"
+
+
+class UnknownWordList(KeyError):
+    """/start_problem 의 words_key 가 등록된 단어 목록에 없음 (클라이언트는 전체 목록을 다시 보내야 한다)"""
+
+    def __init__(self, words_key):
+        super().__init__(words_key)
+        self.words_key = words_key
+
+    def __str__(self):
+        return f"unknown word list {self.words_key!r}, send candidate_words"
+
+
+class ProblemState:
+    __slots__ = ("index", "engine", "opening_book", "book_node", "candidate_mask", "_candidates",
+                 "guess_history", "feedback_history", "starter_index", "error_count", "max_errors",
+                 "constraints", "last_used", "done")
+
+    def __init__(self, index, engine=None, opening_book=None, max_errors=2):
+        self.index = index  # 같은 단어 목록의 문제들이 공유
+        self.engine = engine
+        self.opening_book = opening_book
+        self.book_node = None  # 지금까지 book 대로 진행 중이면 마지막 추측의 노드
+        self.candidate_mask = index.all_mask
+        self._candidates = index.valid_words  # candidate_mask 의 단어 목록 (None 이면 필요할 때 만든다, 읽기 전용)
+        self.guess_history = []
+        self.feedback_history = []
+        self.constraints = []  # 턴마다 (guess, verbal_feedback, code), 모순이 생기면 하나만 고쳐서 다시 계산
+        self.starter_index = 0
+        self.error_count = 0
+        self.max_errors = max_errors
+        self.last_used = time.monotonic()  # idle TTL 기준
+        self.done = False  # 정답 확인(/end_problem 또는 22222) 후에는 짧은 TTL 로 정리
+
+    @property
+    def original_candidates(self):
+        return self.index.words
+
+    @property
+    def candidate_words(self):
+        if self._candidates is None:
+            self._candidates = self.index.words_of(self.candidate_mask)
+        return self._candidates
+
+    def set_candidates(self, mask, words=None):
+        """후보 마스크 갱신, words 를 이미 알고 있으면 같이 넘겨 재계산을 피한다"""
+        self.candidate_mask = mask
+        self._candidates = words
+
+    def has_candidate(self, word):
+        i = self.index.index.get(word)
+        return i is not None and (self.candidate_mask >> i) & 1 == 1
+
+    def constraints_mask(self, constraints):
+        """constraints 를 모두 만족하고 아직 추측하지 않은 단어 마스크 (제약별 마스크는 인덱스에 캐시됨)"""
+        mask = self.index.all_mask & ~self.index.mask_of(self.guess_history)
+        for guess, _, code in constraints:
+            mask &= self.index.constraint_mask(guess, code)
+            if not mask:
+                break
+        return mask
+
+    def reset(self):
+        """원래 후보 전체에서 이미 시도한 단어만 뺀 상태로 되돌린다"""
+        self.set_candidates(self.index.all_mask & ~self.index.mask_of(self.guess_history))
+        self.feedback_history = []
+        self.constraints = []
+        self.error_count = 0
+        self.book_node = None
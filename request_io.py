@@ -0,0 +1,120 @@
+"""StudentHandler 의 요청 읽기/응답 쓰기 빠른 경로
+
+- 본문은 스레드별로 재사용하는 bytearray 에 readinto 로 읽는다 (요청마다 새 bytes 를 만들지 않음)
+- /start_problem 의 candidate_words 배열은 원본 바이트 해시로 기억해 두고, 같은 배열이 다시 오면
+  JSON 파싱 없이 등록된 목록(words_key) 을 쓴다
+- 응답은 상태줄/헤더/본문을 미리 인코딩한 조각으로 만들어 write 한 번에 보낸다
+"""
+import hashlib
+import json
+import re
+import threading
+from http import HTTPStatus
+
+_local = threading.local()
+
+# 문자열 안의 [ ] 는 단어 목록에 없으므로 (영문 단어) 중첩 없는 배열만 잡으면 된다
+WORD_ARRAY_RE = re.compile(rb'"candidate_words"\s*:\s*(\[[^\[\]]*\])')
+PLAIN_WORD_RE = re.compile(r"[A-Za-z]+\Z")
+
+JSON = "application/json"
+
+
+def read_body(rfile, length):
+    """Content-Length 만큼 스레드별 버퍼에 읽어 memoryview 반환 (다음 요청 전까지만 유효)"""
+    buf = getattr(_local, "buf", None)
+    if buf is None or len(buf) < length:
+        buf = _local.buf = bytearray(max(length, 64 * 1024))
+    view = memoryview(buf)[:length]
+    read = 0
+    while read < length:
+        n = rfile.readinto(view[read:])
+        if not n:
+            raise ConnectionError(f"request body truncated ({read}/{length} bytes)")
+        read += n
+    return view
+
+
+def loads(view):
+    return json.loads(str(view, "utf-8")) if len(view) else {}
+
+
+def loads_without_words(view):
+    """candidate_words 배열은 파싱하지 않고 나머지만 해석 (배열 자리는 null)"""
+    match = WORD_ARRAY_RE.search(view)
+    if match is None:
+        return loads(view)
+    start, end = match.span(1)
+    return json.loads(b"".join((view[:start], b"null", view[end:])))
+
+
+class WordArrayCache:
+    """candidate_words 배열 원본 바이트의 해시 -> words_key"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.keys = {}
+        self.hits = 0
+
+    def decode_start_problem(self, view):
+        """/start_problem 본문 해석, (data, digest) 반환
+
+        배열을 알고 있으면 data 에 candidate_words 대신 words_key 를 넣고 digest 는 None,
+        처음 보는 배열이면 전체를 파싱하고 digest 를 돌려준다 (start_problem 뒤 remember 로 등록).
+        """
+        match = WORD_ARRAY_RE.search(view)
+        if match is None:
+            return loads(view), None
+        start, end = match.span(1)
+        digest = hashlib.blake2b(view[start:end], digest_size=16).digest()
+        key = self.keys.get(digest)
+        if key is None:
+            return loads(view), digest
+        # 배열 자리에 null 을 넣은 나머지 (수십 바이트) 만 파싱
+        data = json.loads(b"".join((view[:start], b"null", view[end:])))
+        data["words_key"] = key
+        self.hits += 1
+        return data, None
+
+    def forget(self, keys):
+        """제거된 단어 목록 해시들을 가리키는 항목 삭제 (다음에 오면 전체를 파싱해 다시 등록)"""
+        keys = set(keys)
+        for digest, key in list(self.keys.items()):
+            if key in keys:
+                self.keys.pop(digest, None)
+
+    def remember(self, digest, key):
+        if digest is None:
+            return
+        if len(self.keys) >= self.maxsize:
+            self.keys.clear()
+        self.keys[digest] = key
+
+
+_heads = {}
+
+
+def response(protocol, status, body=b"", content_type=None):
+    """상태줄 + 헤더 + 본문을 하나의 bytes 로 (상태/Content-Type 별 머리 부분은 캐시)"""
+    head = _heads.get((protocol, status, content_type))
+    if head is None:
+        try:
+            phrase = HTTPStatus(status).phrase
+        except ValueError:
+            phrase = ""
+        head = f"{protocol} {status} {phrase}\r\n"
+        if content_type:
+            head += f"Content-Type: {content_type}\r\n"
+        head = _heads[(protocol, status, content_type)] = (head + "Content-Length: ").encode("latin-1")
+    return b"".join((head, str(len(body)).encode(), b"\r\n\r\n", body))
+
+
+def guess_body(guess):
+    """{"guess": ...} 응답 본문 (보통의 영문 단어는 json.dumps 없이)"""
+    if isinstance(guess, str) and PLAIN_WORD_RE.match(guess):
+        return b'{"guess": "' + guess.encode("ascii") + b'"}'
+    return json.dumps({"guess": guess}).encode()
+
+
+def words_key_body(key):
+    return b'{"words_key": "' + key.encode("ascii") + b'"}'
@@ -0,0 +1,114 @@
+"""추측 선택 전략 (SCORING_STRATEGY)
+
+전략은 choose(solver, data, candidates, deadline) 로 다음 추측 하나를 고른다 (없으면 None, data 는 ProblemState).
+- heuristic : 기존 방식, special_guess (글자 겹침) 를 먼저 보고 아니면 1수 엔트로피 + 보너스
+- entropy   : 1수 엔트로피 + 보너스만
+- lookahead : 2수 앞까지 보고 기대 추측 횟수가 가장 작은 단어 (엔트로피 상위 top_k 만 평가)
+"""
+import math
+import time
+
+
+class HeuristicStrategy:
+    name = "heuristic"
+
+    def choose(self, solver, data, candidates, deadline=None):
+        with solver.metrics.span("solver_special_guess_seconds"):
+            special_guess = solver.special_guess(data)
+        if special_guess and special_guess not in data.guess_history:
+            solver._log(f"[SPECIAL GUESS] Using special guess: {special_guess}")
+            return special_guess
+        return solver.select_best_guess(candidates, data.original_candidates, data.engine, deadline)
+
+
+class EntropyStrategy:
+    name = "entropy"
+
+    def choose(self, solver, data, candidates, deadline=None):
+        return solver.select_best_guess(candidates, data.original_candidates, data.engine, deadline)
+
+
+def estimate(n):
+    """후보 n 개를 푸는 데 드는 추측 횟수 근사 (탐색 끝에서 사용)"""
+    if n <= 1:
+        return float(n)
+    if n == 2:
+        return 1.5
+    return 1 + math.log(n, 5)
+
+
+class LookaheadStrategy:
+    """정답이 후보 중 균등하다고 보고 기대 추측 횟수 E(g) = 1 + Σ_p |C_p|/|C| · V(C_p) 를 최소화
+
+    V 는 한 수 더 (각 묶음 안의 단어들 중 묶음을 가장 잘게 나누는 inner_k 개) 평가하고 그 뒤는 estimate().
+    후보가 max_candidates 보다 많으면 entropy 전략으로 대신한다.
+    """
+    name = "lookahead"
+
+    def __init__(self, top_k=10, inner_k=5, max_candidates=300):
+        self.top_k = top_k
+        self.inner_k = inner_k
+        self.max_candidates = max_candidates
+
+    def choose(self, solver, data, candidates, deadline=None):
+        if len(candidates) > self.max_candidates:
+            return EntropyStrategy().choose(solver, data, candidates, deadline)
+
+        # 1수 엔트로피 순위 상위 top_k 만 2수 앞까지 평가 (시간이 다 되면 그때까지의 최선)
+        ranking = solver.rank_guesses(candidates, data.original_candidates, data.engine, deadline)
+        # 후보 단어는 바로 맞힐 수도 있으므로 엔트로피 순위가 조금 낮아도 몇 개는 같이 평가
+        candidate_set = set(candidates)
+        shortlist = [guess for guess, _ in ranking[:self.top_k]]
+        shortlist += [guess for guess, _ in ranking if guess in candidate_set][:self.top_k // 2]
+        best, best_score = None, float("inf")
+        for guess in dict.fromkeys(shortlist):
+            if best is not None and deadline is not None and time.monotonic() >= deadline:
+                break
+            score = self.expected_guesses(solver, data.engine, guess, candidates, depth=2)
+            if score < best_score:
+                best, best_score = guess, score
+        solver._log(f"[LOOKAHEAD] {best} expected {best_score:.3f} guesses", "info")
+        return best
+
+    def partition(self, solver, engine, guess, words):
+        """guess 로 추측했을 때 피드백 패턴별 words 묶음 목록"""
+        groups = {}
+        guess_idx = engine.index.get(guess) if engine is not None else None
+        word_idx = engine.indices(words) if guess_idx is not None else None
+        if word_idx is not None:
+            patterns = engine.matrix[guess_idx, word_idx].tolist()
+        else:
+            patterns = [solver.compute_actual_feedback(word, guess) for word in words]
+        for word, pattern in zip(words, patterns):
+            groups.setdefault(pattern, []).append(word)
+        return list(groups.values())
+
+    def expected_guesses(self, solver, engine, guess, words, depth):
+        total = 1.0
+        for group in self.partition(solver, engine, guess, words):
+            if group == [guess]:
+                continue  # 맞힌 경우
+            total += len(group) / len(words) * self.value(solver, engine, group, depth - 1)
+        return total
+
+    def value(self, solver, engine, words, depth):
+        """words 를 푸는 기대 추측 횟수 (depth 수까지 탐색)"""
+        if depth <= 0 or len(words) <= 2:
+            return estimate(len(words))
+        # 묶음 안의 단어 중 가장 많은 묶음으로 나누는 inner_k 개만 평가
+        shortlist = sorted(words, key=lambda g: -len(self.partition(solver, engine, g, words)))[:self.inner_k]
+        return min(self.expected_guesses(solver, engine, g, words, depth) for g in shortlist)
+
+
+STRATEGIES = {
+    "heuristic": HeuristicStrategy,
+    "entropy": EntropyStrategy,
+    "lookahead": LookaheadStrategy,
+}
+
+
+def get_strategy(name):
+    try:
+        return STRATEGIES[name.lower()]()
+    except KeyError:
+        raise ValueError(f"unknown scoring strategy {name!r} (choose from {', '.join(STRATEGIES)})")
@@ -1,18 +1,43 @@
 import atexit
-import datetime
 import json
+import math
 import os
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from snowflake.snowpark import Session
-from snowflake.cortex import complete
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
 from dotenv import load_dotenv
-from collections import Counter
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import re
+import threading
+import time
 import traceback
 import random
+import candidate_index
+import async_log
+import cortex_client
+import llm_batcher
+import feedback_cache
+import feedback_matrix
+import feedback_parser
+import metrics
+import opening_book
+import problem_state
+import request_io
+import scoring
+import parallel_scoring
+import prefork
 
 load_dotenv()
-WORD_LIST = [line.strip() for line in open("words.txt") if len(line.strip()) == 5]
+
+
+def load_word_list(path="words.txt"):
+    with open(path) as f:
+        return [line.strip() for line in f if len(line.strip()) == 5]
+
+
+def cortex_complete(**kwargs):
+    # snowflake 패키지는 첫 LLM 호출 때 import: 모듈 import 가 네트워크/무거운 의존성 없이 끝나게 한다
+    from snowflake.cortex import complete
+    return complete(**kwargs)
 
 # 샘플 few-shot 예시
 few_shot_examples = [
@@ -91,6 +116,37 @@ def build_prompt(guess: str, verbal_feedback: str, few_shot_data: list) -> str:
 )
     return prompt
 
+def build_batch_prompt(items: list, few_shot_data: list) -> str:
+    """여러 (guess, feedback) 를 번호를 붙여 한 프롬프트로, 응답은 항목마다 "번호: 코드" 한 줄"""
+    prompt = (
+        "Convert each Wordle feedback into a 5-digit code, one digit per letter of the guess:\n"
+        "2 = correct position, 1 = in the word but wrong position, 0 = not in the word.\n\n"
+        "Examples:\n"
+    )
+    for ex in few_shot_data:
+        prompt += f"Guess: {ex['guess']} | Feedback: {ex['feedback']} -> {ex['output']}\n"
+    prompt += "\nItems:\n"
+    for i, (guess, verbal_feedback) in enumerate(items, 1):
+        prompt += f"{i}. Guess: {guess} | Feedback: {verbal_feedback}\n"
+    prompt += "\nAnswer with exactly one line per item in the form \"<number>: <code>\" and nothing else."
+    return prompt
+
+def parse_batch_response(content: str, count: int) -> list:
+    """"번호: 코드" 줄들을 항목 순서의 코드 목록으로 (없는 항목은 None)"""
+    codes = [None] * count
+    for number, code in re.findall(r"^\s*(\d+)\s*[:.)-]\s*([012]{5})\b", content, re.M):
+        i = int(number) - 1
+        if 0 <= i < count and codes[i] is None:
+            codes[i] = code
+    return codes
+
+def response_text(response) -> str:
+    if isinstance(response, str):
+        return response.strip()
+    if isinstance(response, dict):
+        return response.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+    return str(response).strip()
+
 def find_best_match(diverse_letters, now_candidates):
         # 각 글자의 빈도수를 세어 중요도를 부여할 수도 있음
     letter_set = set(diverse_letters)
@@ -105,12 +161,52 @@ def find_best_match(diverse_letters, now_candidates):
 
 class Solver:
     def __init__(self):
-        self.session = self._init_snowflake()
+        self.logger = self._init_logger()
+        self.cortex = self._init_cortex()
         self.model = "claude-3-5-sonnet"
-        self.problems = {}
+        self.problems = OrderedDict()  # problem_id -> ProblemState, 앞쪽일수록 먼저 제거 대상
+        self.done_problems = OrderedDict()  # 완료된 problem_id -> 완료 시각 (완료 순서, DONE_PROBLEM_TTL 정리용)
+        self.evicted_problems = OrderedDict()  # 최근 제거된 problem_id -> 이유 (명확한 오류 응답용)
+        # 문제 상태 수명: 유휴 TTL(초), 완료된 문제의 TTL, 동시에 유지할 최대 문제 수 (LRU)
+        self.problem_ttl = float(os.environ.get("PROBLEM_TTL", 1800))
+        self.done_problem_ttl = float(os.environ.get("DONE_PROBLEM_TTL", 60))
+        self.max_problems = int(os.environ.get("MAX_PROBLEMS", 10000))
+        self.problem_locks = {}  # problem_id -> Lock (threaded 서버에서 같은 문제 요청 직렬화)
+        self.build_locks = {}  # (종류, 단어 목록 해시) -> 만드는 중인 인덱스/엔진의 Lock
+        self.state_lock = threading.Lock()
         self.snowflake_calls = 0
-        self.log_file = open("run.log", "a")
-        self.original_wordlist = WORD_LIST
+        self.metrics = metrics.Metrics()
+        # words.txt, 인덱스, 행렬 엔진, opening book, 병렬 워커는 warm_up() (첫 /start_problem) 에서 준비
+        self.warm_up_lock = threading.Lock()
+        self.original_wordlist = None
+        self.word_lists = OrderedDict()  # 단어 목록 해시 -> 단어 목록 (/start_problem 이 words_key 로 참조, LRU 순서)
+        # 등록해 두는 단어 목록 수 (넘으면 오래 안 쓴 목록과 그 인덱스/행렬 엔진을 제거, 이름 붙은 목록은 유지)
+        self.max_word_lists = int(os.environ.get("MAX_WORD_LISTS", 16))
+        self.word_list_names = {}  # 이름 (예: "default") -> 단어 목록 해시
+        self.word_arrays = request_io.WordArrayCache()  # /start_problem 의 candidate_words 원본 바이트 해시 -> 목록 해시
+        self.engines = {}  # 단어 목록 해시 -> FeedbackMatrix
+        self.indexes = {}  # 단어 목록 해시 -> CandidateIndex
+        self.opening_books = {}  # 단어 목록 해시 -> 결정 트리 루트
+        self.engine = None
+        self.parallel_scorer = None
+        self.parallel_min_candidates = int(os.environ.get("PARALLEL_SCORING_MIN_CANDIDATES", 1000))
+        # 요청당 시간 예산(초): grader 의 10초 timeout 안에서 점수 계산을 끊는 anytime 모드, 0 이하면 사용 안 함
+        self.turn_time_budget = float(os.environ.get("TURN_TIME_BUDGET", 8.0))
+        # 행렬 엔진 없이 (순수 Python) 한 턴에 평가할 최대 추측 단어 수, 0 이면 제한 없이 TURN_TIME_BUDGET 까지
+        self.pure_python_pool = int(os.environ.get("PURE_PYTHON_POOL", 50))
+        # 추측 선택 전략: heuristic (기본) / entropy / lookahead (scoring.py)
+        self.strategy = scoring.get_strategy(os.environ.get("SCORING_STRATEGY", "heuristic"))
+        # 규칙 기반 해석 신뢰도가 이 값 이상이면 LLM 호출 생략
+        self.rule_confidence_threshold = float(os.environ.get("RULE_PARSER_MIN_CONFIDENCE", 0.9))
+        # LLM_BATCH_SIZE > 1 이면 동시에 들어온 LLM 해석을 최대 그 개수만큼 한 번의 호출로 묶는다
+        # (LLM_BATCH_WINDOW: 첫 요청 뒤 더 모으기 위해 기다리는 시간(초))
+        # 묶음용 간단 프롬프트는 실제 모델로 정확도를 재기 전이므로 기본은 1 (항목별 기존 프롬프트)
+        self.llm_batch_size = int(os.environ.get("LLM_BATCH_SIZE", 1))
+        self.llm_batcher = self._init_llm_batcher()
+        self.feedback_cache = feedback_cache.FeedbackCache(
+            maxsize=int(os.environ.get("FEEDBACK_CACHE_SIZE", 4096)),
+            path=os.environ.get("FEEDBACK_CACHE_PATH"),
+        )
         atexit.register(self.cleanup)
         
         # 최적화된 시작 단어들 (정보량이 높은 순서)
@@ -121,7 +217,78 @@ class Solver:
         
 
 
+    def _init_logger(self):
+        # 요청 스레드는 큐에 넣기만 하고 디스크/터미널 쓰기는 백그라운드 스레드가 담당
+        return async_log.AsyncLogger(
+            path="run.log",
+            level=os.environ.get("LOG_LEVEL", "debug"),
+            debug_sample_rate=float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", 0.1)),
+            echo=os.environ.get("LOG_STDOUT", "1") != "0",
+        )
+
+    def _init_cortex(self):
+        # Snowflake 세션은 첫 LLM 호출(또는 warm_up(llm=True)) 때 풀에서 만든다
+        return cortex_client.CortexPool(
+            session_factory=self._init_snowflake,
+            complete_fn=cortex_complete,
+            size=int(os.environ.get("CORTEX_POOL_SIZE", 4)),
+            timeout=float(os.environ.get("CORTEX_TIMEOUT", 4.0)),
+            hedge_after=float(os.environ.get("CORTEX_HEDGE_AFTER", 1.5)),
+            max_retries=int(os.environ.get("CORTEX_MAX_RETRIES", 1)),
+            log=self._log,
+        )
+
+    def _init_llm_batcher(self):
+        if self.llm_batch_size <= 1:
+            return None
+        return llm_batcher.FeedbackBatcher(
+            self.parse_feedback_llm_batch,
+            max_batch=self.llm_batch_size,
+            window=float(os.environ.get("LLM_BATCH_WINDOW", 0.0)),
+            concurrency=self.cortex.size,
+        )
+
+    def after_fork(self):
+        """prefork 워커 프로세스에서 호출: 스레드, Cortex 세션, 점수 계산 워커 풀은 fork 로 넘어오지 않으므로 새로 만든다
+
+        warm_up() 이 만든 단어 목록/인덱스/행렬 엔진/opening book 은 부모와 copy-on-write 로 공유한다.
+        """
+        self.logger = self._init_logger()
+        self.cortex = self._init_cortex()
+        self.llm_batcher = self._init_llm_batcher()
+        self.feedback_cache.after_fork()
+        # 부모의 워커 풀은 부모 것이므로 닫지 않고 버린다
+        self.parallel_scorer = self._init_parallel_scorer()
+
+    def warm_up(self, llm=False):
+        """words.txt 와 그 인덱스/행렬 엔진/opening book/병렬 워커를 한 번만 준비, 단계별 소요 시간(초) 반환
+
+        llm=True 면 Cortex 세션도 하나 미리 열어서 첫 LLM 호출이 연결을 기다리지 않게 한다.
+        """
+        timings = {}
+        if self.original_wordlist is None:
+            with self.warm_up_lock:
+                if self.original_wordlist is None:
+                    start = time.perf_counter()
+                    words = load_word_list()
+                    key, words = self.register_word_list(words, name="default")
+                    self.get_index(words, key)
+                    self.opening_books = self._init_opening_books()
+                    timings["words"] = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    self.engine = self._init_engine(words)
+                    self.parallel_scorer = self._init_parallel_scorer()
+                    timings["engine"] = time.perf_counter() - start
+                    self.original_wordlist = words  # 다른 스레드는 이 값이 설정된 뒤에야 준비 완료로 본다
+        if llm:
+            start = time.perf_counter()
+            self.cortex.warm_up()
+            timings["llm"] = time.perf_counter() - start
+        return timings
+
     def _init_snowflake(self):
+        from snowflake.snowpark import Session
         connection_params = {
             "account": "NPSRWTY-ZGB66966",
             "user": "AHNCW", 
@@ -133,74 +300,277 @@ class Solver:
         }
         return Session.builder.configs(connection_params).create()
 
+    def _init_engine(self, words):
+        """FEEDBACK_ENGINE=matrix 이면 words.txt 피드백 행렬을 캐시에서 매핑하거나 새로 만든다"""
+        if os.environ.get("FEEDBACK_ENGINE", "").lower() != "matrix":
+            return None
+        if not feedback_matrix.available():
+            self._log("FEEDBACK_ENGINE=matrix requires numpy, using pure Python path", "warning")
+            return None
+        return self.get_engine(words)
+
+    def _init_parallel_scorer(self):
+        """SCORING_WORKERS > 0 이면 행렬 엔진 점수 계산용 워커 프로세스를 미리 띄운다"""
+        workers = int(os.environ.get("SCORING_WORKERS", 0))
+        if workers <= 0 or self.engine is None or self.engine.matrix_path is None:
+            return None
+        scorer = parallel_scoring.ParallelScorer(workers)
+        self._log(f"Parallel scoring: {scorer.warm_up(self.engine)} worker processes ready")
+        return scorer
+
+    def _init_opening_books(self):
+        """OPENING_BOOK_PATH 의 opening book (opening_book.py 로 생성) 로드"""
+        path = os.environ.get("OPENING_BOOK_PATH", "opening_book.json")
+        if not os.path.exists(path):
+            return {}
+        try:
+            book = opening_book.load_book(path)
+            self._log(f"Opening book loaded from {path} ({book['depth']} turns)")
+            return {book["words_key"]: book["tree"]}
+        except Exception as e:
+            self._log(f"Opening book load failed: {e}", "warning")
+            return {}
+
+    def _build_once(self, kind, registry, key, build):
+        """registry[key] 가 없으면 만들어 등록, 만드는 동안은 같은 key 의 요청만 기다린다
+
+        state_lock 은 조회/등록 때만 잡는다 (모든 요청이 problem_lock/get_problem 으로 잡는 락이므로
+        행렬 빌드 같은 긴 작업을 그 안에서 하면 관계없는 요청까지 멈춘다).
+        """
+        with self.state_lock:
+            value = registry.get(key)
+            if value is not None:
+                return value
+            lock = self.build_locks.setdefault((kind, key), threading.Lock())
+        with lock:
+            with self.state_lock:
+                value = registry.get(key)
+            if value is None:
+                value = build()
+                with self.state_lock:
+                    registry[key] = value
+                    self.build_locks.pop((kind, key), None)
+        return value
+
+    def get_engine(self, words, key=None):
+        """단어 목록 해시로 피드백 행렬 엔진을 찾고, 없으면 디스크 캐시(FEEDBACK_MATRIX_CACHE)에서 연다"""
+        key = key or feedback_matrix.word_list_key(words)
+
+        def build():
+            cache_dir = os.environ.get("FEEDBACK_MATRIX_CACHE", ".feedback_cache")
+            engine = feedback_matrix.FeedbackMatrix.open_cached(words, cache_dir)
+            engine.first_turn_ranking()
+            self._log(f"Feedback matrix {key} mapped for {len(words)} words")
+            return engine
+
+        return self._build_once("engine", self.engines, key, build)
+
+    def register_word_list(self, words, name=None, key=None):
+        """단어 목록을 해시로 등록하고 (이미 있으면 기존 목록을 재사용) (해시, 단어 목록) 반환"""
+        key = key or feedback_matrix.word_list_key(words)
+        with self.state_lock:
+            words = self.word_lists.setdefault(key, words)
+            self.word_lists.move_to_end(key)
+            if name:
+                self.word_list_names[name] = key
+        self.evict_word_lists()
+        return key, words
+
+    def resolve_word_list(self, words_key):
+        """해시 또는 이름으로 등록된 (해시, 단어 목록), 없으면 UnknownWordList"""
+        with self.state_lock:
+            key = self.word_list_names.get(words_key, words_key)
+            words = self.word_lists.get(key)
+            if words is not None:
+                self.word_lists.move_to_end(key)
+        if words is None:
+            raise problem_state.UnknownWordList(words_key)
+        return key, words
+
+    def evict_word_lists(self):
+        """MAX_WORD_LISTS 를 넘은 만큼 오래 안 쓴 목록을 메모리의 인덱스/행렬 엔진과 함께 제거, 제거한 수 반환
+
+        이미 그 목록으로 진행 중인 문제는 자기 인덱스/엔진 참조를 그대로 쓴다.
+        디스크의 행렬 캐시 (FEEDBACK_MATRIX_CACHE) 는 다른 프로세스와 다음 시작을 위해 그대로 둔다.
+        """
+        with self.state_lock:
+            named = set(self.word_list_names.values())
+            excess = len(self.word_lists) - self.max_word_lists
+            if excess <= 0:
+                return 0
+            evicted = [key for key in self.word_lists if key not in named][:excess]
+            for key in evicted:
+                del self.word_lists[key]
+                self.indexes.pop(key, None)
+                self.engines.pop(key, None)
+            self.word_arrays.forget(evicted)
+        self.metrics.inc("solver_word_lists_evicted_total", len(evicted))
+        return len(evicted)
+
+    def get_index(self, words, key=None):
+        """단어 목록 해시로 비트셋 후보 인덱스를 찾고, 없으면 새로 만든다"""
+        key = key or feedback_matrix.word_list_key(words)
+        return self._build_once("index", self.indexes, key, lambda: candidate_index.CandidateIndex(words))
+
+    def problem_lock(self, problem_id, create=False):
+        """problem_id 별 Lock, 서로 다른 문제는 병렬로 처리된다
+
+        Lock 은 시작된 문제 (또는 create=True 인 /start_problem) 에만 만든다. 모르는 problem_id 는
+        UnknownProblem (요청마다 Lock 이 쌓이지 않게).
+        """
+        with self.state_lock:
+            lock = self.problem_locks.get(problem_id)
+            if lock is None:
+                if not create and problem_id not in self.problems:
+                    raise problem_state.UnknownProblem(problem_id, self.evicted_problems.get(problem_id))
+                lock = self.problem_locks[problem_id] = threading.Lock()
+            return lock
+
+    def discard_problem_lock(self, problem_id):
+        """시작에 실패한 문제의 Lock 정리 (이미 있는 문제의 Lock 은 그대로)"""
+        with self.state_lock:
+            if problem_id not in self.problems:
+                self.problem_locks.pop(problem_id, None)
+
+    def get_problem(self, problem_id):
+        """problem_id 의 상태 (LRU 순서 갱신), 없으면 UnknownProblem"""
+        with self.state_lock:
+            data = self.problems.get(problem_id)
+            if data is None:
+                raise problem_state.UnknownProblem(problem_id, self.evicted_problems.get(problem_id))
+            self.problems.move_to_end(problem_id)
+            data.last_used = time.monotonic()
+        return data
+
+    def end_problem(self, problem_id):
+        """문제 완료 표시: 완료 순서 목록에 넣어 DONE_PROBLEM_TTL 뒤 제거되게 한다"""
+        data = self.get_problem(problem_id)
+        with self.state_lock:
+            data.done = True
+            self.done_problems[problem_id] = time.monotonic()
+            self.done_problems.move_to_end(problem_id)
+
+    def _evict(self, problem_id, reason):
+        # state_lock 안에서 호출
+        del self.problems[problem_id]
+        self.done_problems.pop(problem_id, None)
+        self.problem_locks.pop(problem_id, None)
+        self.evicted_problems[problem_id] = reason
+        self.evicted_problems.move_to_end(problem_id)
+        if len(self.evicted_problems) > self.max_problems:
+            self.evicted_problems.popitem(last=False)
+        self.metrics.inc("solver_problems_evicted_total", reason=reason)
+
+    def evict_problems(self):
+        """완료 후 DONE_PROBLEM_TTL, 유휴 PROBLEM_TTL 이 지났거나 MAX_PROBLEMS 를 넘은 문제를 제거, 제거한 수 반환
+
+        완료된 문제는 완료 순서, 나머지는 마지막 사용 순서(LRU) 로 따로 훑으므로
+        아직 TTL 이 남은 앞쪽 문제가 뒤의 문제 정리를 막지 않는다.
+        """
+        now = time.monotonic()
+        evicted = 0
+        with self.state_lock:
+            while self.done_problems:
+                problem_id, finished = next(iter(self.done_problems.items()))
+                if now - finished <= self.done_problem_ttl:
+                    break
+                self._evict(problem_id, "done")
+                evicted += 1
+            while self.problems:
+                problem_id, data = next(iter(self.problems.items()))
+                if now - data.last_used > self.problem_ttl:
+                    reason = "ttl"
+                elif len(self.problems) > self.max_problems:
+                    reason = "lru"
+                else:
+                    break
+                self._evict(problem_id, reason)
+                evicted += 1
+        return evicted
+
     def cleanup(self):
         try:
-            self.session.close()
-            self.log_file.close()
+            self._log(f"Feedback cache stats: {self.feedback_cache.stats()}")
+            self.feedback_cache.close()
+            self._log(f"Cortex pool stats: {self.cortex.stats()}")
+            self.cortex.close()
+            if self.llm_batcher is not None:
+                self._log(f"LLM batch stats: {self.llm_batcher.stats()}")
+                self.llm_batcher.close()
+            if self.parallel_scorer is not None:
+                self.parallel_scorer.close()
+            self.logger.close()
         except:
             pass
 
-    def _log(self, msg):
-        ts = datetime.datetime.now().isoformat()
-        print(f"[LOG] {msg}")
-        #self.log_file.write(f"[{ts}] {msg}\n")
-        self.log_file.flush()
-
-    def start_problem(self, problem_id, candidate_words):
-        self.problems[problem_id] = {
-            "original_candidates": candidate_words.copy(),
-            "candidate_words": candidate_words.copy(),
-            "guess_history": [],
-            "feedback_history": [],
-            "starter_index": 0,
-            "error_count": 0,
-            "max_errors": 2
-        }
+    def _log(self, msg, level="info", sample=False):
+        self.logger.log(msg, level, sample)
+
+    def metrics_text(self):
+        """/metrics 응답 (Prometheus text format)"""
+        self.evict_problems()
+        gauges = {"solver_active_problems": len(self.problems), "solver_snowflake_calls": self.snowflake_calls}
+        for name, value in self.feedback_cache.stats().items():
+            gauges[f"solver_feedback_cache_{name}"] = value
+        for name, value in self.cortex.stats().items():
+            gauges[f"solver_cortex_{name}"] = value
+        if self.llm_batcher is not None:
+            for name, value in self.llm_batcher.stats().items():
+                gauges[f"solver_llm_batch_{name}"] = value
+        return self.metrics.render(gauges)
+
+    def start_problem(self, problem_id, candidate_words=None, words_key=None):
+        """candidate_words 전체 또는 등록된 목록의 words_key(해시/이름) 로 문제 시작, 목록 해시 반환"""
+        self.warm_up()
+        if candidate_words is None:
+            key, candidate_words = self.resolve_word_list(words_key)
+        else:
+            key, candidate_words = self.register_word_list(candidate_words)
+        data = problem_state.ProblemState(
+            index=self.get_index(candidate_words, key),
+            engine=self.get_engine(candidate_words, key) if self.engine is not None else None,
+            opening_book=self.opening_books.get(key),
+        )
+        with self.state_lock:
+            self.problems[problem_id] = data
+            self.problems.move_to_end(problem_id)
+            self.done_problems.pop(problem_id, None)
+            self.evicted_problems.pop(problem_id, None)
+        self.evict_problems()
         self._log(f"=== Problem {problem_id} started with {len(candidate_words)} candidates ===")
+        return key
 
     def add_feedback(self, problem_id, verbal_feedback):
+        data = self.get_problem(problem_id)
         if verbal_feedback:
-            self.problems[problem_id]["feedback_history"].append(verbal_feedback)
+            data.feedback_history.append(verbal_feedback)
 
-    def reset_with_new_starter(self, problem_id):
-        """오류 발생 시 새로운 시작 단어로 재시작"""
-        data = self.problems[problem_id]
-        data["starter_index"] += 1
-        data["candidate_words"] = data["original_candidates"].copy()
-        
-        # 이전에 시도한 단어들을 제외
-        for old_guess in data["guess_history"]:
-            if old_guess in data["candidate_words"]:
-                data["candidate_words"].remove(old_guess)
-        
-        data["feedback_history"] = []
-        data["error_count"] = 0  # 에러 카운트 리셋
-        
-        self._log(f"RESET: Using starter #{data['starter_index']}, candidates: {len(data['candidate_words'])}")
+    def reset_with_new_starter(self, data):
+        """오류 발생 시 새로운 시작 단어로 재시작 (이전에 시도한 단어들은 제외)"""
+        self.metrics.inc("solver_resets_total")
+        data.starter_index += 1
+        data.reset()
+        self._log(f"RESET: Using starter #{data.starter_index}, candidates: {len(data.candidate_words)}", "warning")
 
     def parse_feedback_llm(self, guess, verbal_feedback):
         try:
             normalized = normalize_feedback(verbal_feedback)
             user_prompt = build_prompt(guess, normalized, few_shot_examples)
 
-            response = complete(
+            self.snowflake_calls += 1
+            self.metrics.inc("solver_llm_calls_total")
+            response = self.cortex.complete(
                 model=self.model,
                 prompt=[
                     {"role": "system", "content": "You are a Wordle feedback interpreter."},
                     {"role": "user", "content": user_prompt, }
                 ],
                 options={"max_tokens": 115, "temperature": 0.0},
-                session=self.session
             )
 
-            self._log(f"[RAW LLM RESPONSE] {response}")
+            self._log(f"[RAW LLM RESPONSE] {response}", "debug", sample=True)
 
-            if isinstance(response, str):
-                content = response.strip()
-            elif isinstance(response, dict):
-                content = response.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-            else:
-                content = str(response).strip()
+            content = response_text(response)
 
             #clean_response = content.upper()
             #self._log(f"[CLEANED RESPONSE] {clean_response}")
@@ -208,43 +578,136 @@ class Solver:
             # 정확히 5글자 GYB만 뽑기 (공백/기호 제거 후)
             gyb_exact = re.findall(r"\b[012]{5}\b", content)
             if gyb_exact:
-                self._log(f"[EXACT PATTERN MATCH] {gyb_exact[0]}")
+                self._log(f"[EXACT PATTERN MATCH] {gyb_exact[0]}", "debug")
                 return gyb_exact[0]
 
             # 문자만 필터링해서 만들어보기
             gyb_only = ''.join(c for c in content if c in "012")
             if len(gyb_only) >= 5:
-                self._log(f"[CHAR ONLY MATCH] {gyb_only[:5]}")
+                self._log(f"[CHAR ONLY MATCH] {gyb_only[:5]}", "debug")
                 return gyb_only[:5]
 
-            self._log(f"[FALLBACK] Not enough info, defaulting to 00000. Original: {content}")
+            self._log(f"[FALLBACK] Not enough info, defaulting to 00000. Original: {content}", "warning")
             return gyb_only.ljust(5, 'G')
 
         except Exception as e:
-            self._log(f"[LLM PARSE ERROR] {e}")
-            return "00000"
+            self._log(f"[LLM PARSE ERROR] {e}", "warning")
+            self.metrics.inc("solver_llm_errors_total")
+            return None
 
         
-    def parse_feedback(self, guess, verbal_feedback):
+    def parse_feedback_llm_batch(self, pairs):
+        """여러 (guess, verbal_feedback) 를 한 번의 Cortex 호출로 해석, 항목별 코드 (실패하면 None)"""
         try:
-            llm_result = self.parse_feedback_llm(guess, verbal_feedback)
-            if self.is_valid_feedback_code(llm_result):
-                self._log(f"[LLM FEEDBACK PARSED]: guess = {guess}, parsed_code = {llm_result}")
-                return llm_result
-            else:
-                return self.parse_feedback_rules(guess, verbal_feedback)
+            self.snowflake_calls += 1
+            self.metrics.inc("solver_llm_calls_total")
+            self.metrics.inc("solver_llm_items_total", len(pairs))
+            response = self.cortex.complete(
+                model=self.model,
+                prompt=[
+                    {"role": "system", "content": "You are a Wordle feedback interpreter."},
+                    {"role": "user", "content": build_batch_prompt(pairs, few_shot_examples)},
+                ],
+                # 항목당 "nn: ddddd\n" 정도면 충분
+                options={"max_tokens": 8 * len(pairs) + 8, "temperature": 0.0},
+            )
+            content = response_text(response)
+            self._log(f"[RAW LLM BATCH RESPONSE] {content}", "debug", sample=True)
+            codes = parse_batch_response(content, len(pairs))
+        except Exception as e:
+            self._log(f"[LLM BATCH PARSE ERROR] {e}", "warning")
+            self.metrics.inc("solver_llm_errors_total")
+            return [None] * len(pairs)
+        return [code if code and self.is_valid_feedback_code(code) else None for code in codes]
+
+    def _parse_feedback_llm(self, guess, verbal_feedback):
+        if self.llm_batcher is None:
+            return self.parse_feedback_llm(guess, verbal_feedback)
+        return self._wait_llm(self.llm_batcher.submit(guess, verbal_feedback))
+
+    def _wait_llm(self, future):
+        # Cortex 호출 deadline(재시도 포함) + 모으는 시간보다 오래 기다리지 않는다
+        try:
+            return future.result(self.cortex.timeout + self.llm_batcher.window + 1.0)
         except Exception as e:
-            self._log(f"Parse feedback error: {e}")
-            return self.parse_feedback_rules(guess, verbal_feedback)
+            self._log(f"Parse feedback error: {e}", "warning")
+            return None
+
+    def parse_feedback(self, guess, verbal_feedback):
+        start = time.perf_counter()
+        return self._record_parse(start, *self._parse_feedback(guess, verbal_feedback))
+
+    def _record_parse(self, start, code, source):
+        self.metrics.observe("solver_parse_seconds", time.perf_counter() - start, source=source)
+        self.metrics.inc("solver_feedback_parsed_total", source=source)
+        return code
+
+    def _parse_feedback(self, guess, verbal_feedback):
+        """(피드백 코드, 해석 경로: cache/rule/llm/fallback)"""
+        local = self._parse_feedback_local(guess, verbal_feedback)
+        if local is not None:
+            return local
+        return self._accept_llm_result(guess, verbal_feedback, self._parse_feedback_llm(guess, verbal_feedback))
+
+    def _parse_feedback_local(self, guess, verbal_feedback):
+        """캐시나 규칙 기반 해석으로 충분하면 (코드, 경로), LLM 이 필요하면 None"""
+        cache_key = feedback_cache.make_key(guess, verbal_feedback)
+        cached = self.feedback_cache.get(cache_key)
+        if cached is not None:
+            self._log(f"[CACHED FEEDBACK]: guess = {guess}, parsed_code = {cached}", "debug")
+            return cached, "cache"
+
+        rule_result, confidence = feedback_parser.parse_feedback_rules(guess, verbal_feedback)
+        if confidence >= self.rule_confidence_threshold:
+            self._log(f"[RULE FEEDBACK PARSED]: guess = {guess}, parsed_code = {rule_result}, confidence = {confidence:.2f}", "debug")
+            self.feedback_cache.put(cache_key, rule_result)
+            return rule_result, "rule"
+        return None
+
+    def _accept_llm_result(self, guess, verbal_feedback, llm_result):
+        """LLM 결과가 유효하면 캐시에 넣고 사용, 아니면 규칙 기반 fallback"""
+        if llm_result and self.is_valid_feedback_code(llm_result):
+            self._log(f"[LLM FEEDBACK PARSED]: guess = {guess}, parsed_code = {llm_result}")
+            self.feedback_cache.put(feedback_cache.make_key(guess, verbal_feedback), llm_result)
+            return llm_result, "llm"
+        return self.parse_feedback_rules(guess, verbal_feedback), "fallback"
+
+    def parse_feedback_batch(self, pairs):
+        """여러 (guess, verbal_feedback) 를 한 번에 해석, {(guess, verbal_feedback): code}
+
+        같은 쌍은 한 번만 해석하고, LLM 이 필요한 쌍은 batcher 에 한꺼번에 넣어 LLM_BATCH_SIZE 개씩 한 호출로 묶는다.
+        """
+        results = {}
+        llm_pairs = []
+        for pair in dict.fromkeys(pairs):
+            start = time.perf_counter()
+            local = self._parse_feedback_local(*pair)
+            if local is None:
+                llm_pairs.append(pair)
+            else:
+                results[pair] = self._record_parse(start, *local)
+        if not llm_pairs:
+            return results
+
+        start = time.perf_counter()
+        if self.llm_batcher is not None:
+            llm_codes = [self._wait_llm(future) for future in self.llm_batcher.submit_many(llm_pairs)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(llm_pairs), self.cortex.size)) as executor:
+                llm_codes = list(executor.map(lambda pair: self.parse_feedback_llm(*pair), llm_pairs))
+        for pair, code in zip(llm_pairs, llm_codes):
+            results[pair] = self._record_parse(start, *self._accept_llm_result(*pair, code))
+        return results
 
     def is_valid_feedback_code(self, code):
         """피드백 코드가 유효한지 확인"""
         return len(code) == 5 and all(c in '012' for c in code)
 
     def parse_feedback_rules(self, guess, verbal_feedback):
-        """규칙 기반 피드백 해석 (간단 버전, 예외 처리를 위해 존재)"""
-        self._log(f"Fallback parsing used: {verbal_feedback}")
-        return "00000"  # 아주 간단한 placeholder
+        """규칙 기반 피드백 해석 (LLM 결과가 없을 때의 fallback, 신뢰도와 관계없이 코드 반환)"""
+        code, confidence = feedback_parser.parse_feedback_rules(guess, verbal_feedback)
+        self._log(f"Fallback parsing used: {verbal_feedback} -> {code} (confidence {confidence:.2f})", "warning")
+        return code
 
     def compute_actual_feedback(self, secret, guess):
         """실제 Wordle 규칙에 따라 피드백 계산 (정확한 구현)"""
@@ -269,34 +732,16 @@ class Solver:
 
         return ''.join(feedback)
 
-    """피드백에 맞는 후보들만 필터링"""
-    def filter_candidates(self, candidates, guess, feedback_code):
-        valid_candidates = []
-        
-        for candidate in candidates:
-            try:
-                if self.is_word_consistent(candidate, guess, feedback_code):
-                    valid_candidates.append(candidate)
-            except Exception as e:
-                self._log(f"Error checking word {candidate}: {e}")
-                continue
-        
-        return valid_candidates
-
-    def is_word_consistent(self, word, guess, feedback_code):
-        """단어가 추측과 피드백에 일치하는지 확인"""
-        if len(word) != 5 or len(guess) != 5 or len(feedback_code) != 5:
-            return False
-
-        # 실제 Wordle 규칙에 따라 피드백을 재계산
-        actual_feedback = self.compute_actual_feedback(word, guess)
-        return actual_feedback == feedback_code
-
     """단어의 정보 획득량 계산"""
     def calculate_information_gain(self, word, candidates):
         if not candidates or len(candidates) <= 1:
             return 0
-        
+
+        if self.engine is not None:
+            entropy = self.engine.entropy(word, candidates)
+            if entropy is not None:
+                return entropy
+
         feedback_groups = {}
         
         # 각 후보에 대해 이 단어로 추측했을 때의 피드백 계산
@@ -310,12 +755,67 @@ class Solver:
         for count in feedback_groups.values():
             p = count / total
             if p > 0:
-                import math
                 entropy -= p * math.log2(p)
         
         return entropy
 
-    def select_best_guess(self, candidates):
+    def prioritize_guesses(self, pool, candidates):
+        """anytime 평가 순서: 후보들에 자주 나오는 글자를 많이 포함한 단어부터 (값싼 글자 빈도 휴리스틱)"""
+        letter_freq = Counter(ch for word in candidates for ch in set(word))
+        return sorted(pool, key=lambda word: -sum(letter_freq[ch] for ch in set(word)))
+
+    def rank_guesses(self, candidates, guess_pool=None, engine=None, deadline=None):
+        """후보 집합 기준 추측 단어 점수 순위 [(word, score)] (행렬 엔진이 있으면 guess_pool 전체 평가)
+
+        deadline(time.monotonic 기준)이 있으면 글자 빈도 순서로 평가하다가 시간이 다 되면
+        그때까지 평가한 단어들 중에서 순위를 매긴다.
+        """
+        engine = engine or self.engine
+        start = time.monotonic()
+        ranking = None
+        if engine is not None:
+            pool = list(guess_pool or candidates)
+            position = {word: i for i, word in enumerate(pool)}
+            if deadline is not None:
+                pool = self.prioritize_guesses(pool, candidates)
+            if self.parallel_scorer is not None and len(candidates) >= self.parallel_min_candidates:
+                ranking = self.parallel_scorer.rank_guesses(engine, pool, candidates, deadline)
+            else:
+                ranking = engine.rank_guesses(pool, candidates, deadline)
+
+        if ranking is None:
+            # 행렬 엔진이 없으면 단어 하나에 후보 수만큼 피드백 계산이 들므로 평가할 단어 수 제한
+            # (PURE_PYTHON_POOL=0 이면 후보 전체를 글자 빈도 순으로 평가하고 deadline 이 평가량을 정한다)
+            pool = list(candidates[:self.pure_python_pool] if self.pure_python_pool > 0 else candidates)
+            position = {word: i for i, word in enumerate(pool)}
+            if deadline is not None:
+                pool = self.prioritize_guesses(pool, candidates)
+            ranking = []
+            for word in pool:
+                if ranking and deadline is not None and time.monotonic() >= deadline:
+                    break
+                try:
+                    ranking.append((word, self.calculate_information_gain(word, candidates)))
+                except Exception as e:
+                    self._log(f"Error calculating score for {word}: {e}", "warning")
+
+        if deadline is not None:
+            self._log(f"[ANYTIME] evaluated {len(ranking)}/{len(pool)} guesses in {time.monotonic() - start:.3f}s", "info")
+
+        candidate_set = set(candidates)
+        scored = []
+        for word, info_gain in ranking:
+            # 고유 글자 수 보너스
+            unique_bonus = len(set(word.lower())) * 0.1
+            # 후보 단어는 바로 정답일 확률만큼 가산 (탐색용 비후보 단어와 비교하기 위함)
+            win_bonus = 1 / len(candidates) if word in candidate_set else 0
+            scored.append((word, info_gain + unique_bonus + win_bonus))
+
+        # 같은 점수는 원래 pool 순서로 (평가 순서와 관계없이 같은 결과)
+        scored.sort(key=lambda item: (-item[1], position.get(item[0], len(position))))
+        return scored
+
+    def select_best_guess(self, candidates, guess_pool=None, engine=None, deadline=None):
         """최적의 다음 추측 선택"""
         if not candidates:
             return None
@@ -327,66 +827,55 @@ class Solver:
             return candidates[0]
         
         try:
-            best_word = None
-            best_score = -1
-            
-            # 성능을 위해 검사할 단어 수 제한
-            check_words = candidates[:min(50, len(candidates))]
-            
-            for word in check_words:
-                try:
-                    # 정보 이득 계산
-                    info_gain = self.calculate_information_gain(word, candidates)
-                    
-                    # 고유 글자 수 보너스
-                    unique_letters = len(set(word.lower()))
-                    unique_bonus = unique_letters * 0.1
-                    
-                    # 총 점수
-                    score = info_gain + unique_bonus
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_word = word
-                        
-                except Exception as e:
-                    self._log(f"Error calculating score for {word}: {e}")
-                    continue
-            
-            return best_word or candidates[0]
+            ranking = self.rank_guesses(candidates, guess_pool, engine, deadline)
+            return ranking[0][0] if ranking else candidates[0]
             
         except Exception as e:
-            self._log(f"Error in select_best_guess: {e}")
+            self._log(f"Error in select_best_guess: {e}", "warning")
             return candidates[0]
 
     """다음 시작 단어 선택 (candidate_words에 존재하는 가장 앞 optimal_starter)"""
-    def get_next_starter(self, problem_id):
-        data = self.problems[problem_id]
-        starter_idx = data["starter_index"]
+    def get_next_starter(self, data):
+        starter_idx = data.starter_index
+
+        # opening book 의 첫 수 (재시작 후에는 사용하지 않음)
+        book = data.opening_book
+        if book is not None and starter_idx == 0 and data.has_candidate(book["g"]):
+            data.book_node = book
+            return book["g"]
+
+        # 행렬 엔진이 있으면 캐시된 첫 턴 엔트로피 순위를 시작 단어 목록으로 사용
+        if data.engine is not None:
+            ranking = data.engine.first_turn_ranking()
+            for i in range(starter_idx, len(ranking)):
+                starter = ranking[i][0]
+                if data.has_candidate(starter):
+                    data.starter_index = i
+                    return starter
 
         # optimal_starters 순회하면서 존재하는 것 중 첫 번째 선택
         for i in range(starter_idx, len(self.optimal_starters)):
             starter = self.optimal_starters[i]
-            if starter in data["candidate_words"]:
-                data["starter_index"] = i
+            if data.has_candidate(starter):
+                data.starter_index = i
                 return starter
 
         # 백업: 고유 글자가 많은 단어 선택
-        return max(data["candidate_words"][:20], key=lambda w: len(set(w)), default=data["candidate_words"][0])
+        return max(data.candidate_words[:20], key=lambda w: len(set(w)), default=data.candidate_words[0])
     
     from collections import Counter
 
 
-    def special_guess(self, problem_id):
-        data = self.problems[problem_id]
-        ori_candidates = data["original_candidates"]
-        now_candidates = data["candidate_words"]
-        guesses = data["guess_history"]
+    def special_guess(self, data):
+        ori_candidates = data.original_candidates
+        now_candidates = data.candidate_words
+        guesses = data.guess_history
 
         if len(now_candidates) <= 5:
             return None
         
-        possible_letter_sets = [set(word[i] for word in now_candidates) for i in range(5)]
+        # 위치별 가능한 글자: 비트셋 인덱스에서 바로 계산
+        possible_letter_sets = data.index.position_letters(data.candidate_mask)
 
         diverse_letters = set()
         common_letters = []
@@ -410,16 +899,102 @@ class Solver:
 
         
 
-    def choose_next_guess(self, problem_id, turn):
-        data = self.problems[problem_id]
-        candidates = data["candidate_words"]
-        history = data["feedback_history"]
-        guesses = data["guess_history"]
+    def guess_batch(self, items):
+        """여러 문제의 한 턴을 한 번에 처리: [{problem_id, verbal_feedback, turn}] -> [{problem_id, guess 또는 error}]
+
+        피드백 해석을 먼저 모아서 하고, 배치 전체가 하나의 시간 예산(TURN_TIME_BUDGET)을 나눠 쓴다.
+        """
+        deadline = time.monotonic() + self.turn_time_budget if self.turn_time_budget > 0 else None
+        results = [None] * len(items)
+        pending = []
+        pairs = {}
+        for i, item in enumerate(items):
+            problem_id = item["problem_id"]
+            try:
+                with self.problem_lock(problem_id):
+                    feedback = item.get("verbal_feedback")
+                    self.add_feedback(problem_id, feedback)
+                    guesses = self.get_problem(problem_id).guess_history
+                    if feedback and guesses:
+                        pairs[i] = (guesses[-1], feedback)
+                pending.append(i)
+            except problem_state.UnknownProblem as e:
+                results[i] = {"problem_id": problem_id, "error": str(e)}
+
+        codes = self.parse_feedback_batch(list(pairs.values()))
+        for i in pending:
+            problem_id = items[i]["problem_id"]
+            feedback_code = codes[pairs[i]] if i in pairs else None
+            try:
+                with self.problem_lock(problem_id):
+                    guess = self.choose_next_guess(problem_id, items[i]["turn"], deadline, feedback_code)
+                results[i] = {"problem_id": problem_id, "guess": guess}
+            except problem_state.UnknownProblem as e:
+                results[i] = {"problem_id": problem_id, "error": str(e)}
+        return results
+
+    def repair_constraints(self, data):
+        """후보가 0개가 됐을 때 가장 의심스러운 제약 하나만 고치거나 빼서 다시 계산한 마스크 (실패하면 0)
+
+        의심 순서: 규칙 기반 해석과 코드가 다른 것, 규칙 해석 신뢰도가 낮은 것, 최근 것.
+        그 제약의 코드를 규칙 기반 코드, 한 자리만 다른 코드 순으로 바꿔 보고 모두 안 되면 제약을 뺀다.
+        """
+        constraints = data.constraints
+        rule_parses = [feedback_parser.parse_feedback_rules(guess, feedback) for guess, feedback, _ in constraints]
+
+        def suspicion(i):
+            rule_code, confidence = rule_parses[i]
+            return rule_code == constraints[i][2], confidence, -i
+
+        for i in sorted(range(len(constraints)), key=suspicion):
+            guess, feedback, code = constraints[i]
+            base = data.constraints_mask(constraints[:i] + constraints[i + 1:])
+            if not base:
+                continue
+
+            rule_code = rule_parses[i][0]
+            repaired, mask = None, base & data.index.constraint_mask(guess, rule_code)
+            if rule_code != code and mask:
+                repaired = rule_code
+                self.feedback_cache.put(feedback_cache.make_key(guess, feedback), rule_code)
+            else:
+                # 캐시된 해석이 틀렸을 수 있으니 같은 피드백은 다음에 다시 해석하게 한다
+                self.feedback_cache.discard(feedback_cache.make_key(guess, feedback))
+                # 한 자리만 다른 코드 중 후보를 가장 많이 남기는 것 (정답을 잘못 지울 위험이 가장 작다)
+                mask = 0
+                for pos in range(5):
+                    for digit in "012":
+                        if digit == code[pos]:
+                            continue
+                        near = code[:pos] + digit + code[pos + 1:]
+                        near_mask = base & data.index.constraint_mask(guess, near)
+                        if near_mask.bit_count() > mask.bit_count():
+                            repaired, mask = near, near_mask
+
+            if repaired is not None:
+                constraints[i] = (guess, feedback, repaired)
+                kind = "replace"
+            else:
+                del constraints[i]
+                mask = base
+                kind = "drop"
+            self.metrics.inc("solver_constraint_repairs_total", kind=kind)
+            self._log(f"[REPAIR] {kind} constraint {guess} {code} -> {repaired}, {mask.bit_count()} candidates", "warning")
+            return mask
+        return 0
+
+    def choose_next_guess(self, problem_id, turn, deadline=None, feedback_code=None):
+        if deadline is None and self.turn_time_budget > 0:
+            deadline = time.monotonic() + self.turn_time_budget
+        data = self.get_problem(problem_id)
+        candidates = data.candidate_words
+        history = data.feedback_history
+        guesses = data.guess_history
 
         try:
             # 첫 번째 추측
             if not history:
-                guess = self.get_next_starter(problem_id)
+                guess = self.get_next_starter(data)
                 guesses.append(guess)
                 self._log(f"First guess: {guess}")
                 return guess
@@ -428,37 +1003,64 @@ class Solver:
             last_guess = guesses[-1]
             last_feedback = history[-1]
             
-            # 피드백 파싱
-            feedback_code = self.parse_feedback(last_guess, last_feedback)
+            # 피드백 파싱 (배치 요청이면 이미 해석된 코드를 받는다)
+            if feedback_code is None:
+                feedback_code = self.parse_feedback(last_guess, last_feedback)
+            if feedback_code == "22222":
+                # 정답 확인: 완료 표시만 하고 같은 단어를 돌려준다
+                self.end_problem(problem_id)
+                return last_guess
+
+            # opening book 안에 있으면 (추측, 패턴) 에 대한 다음 수를 O(1) 로 조회
+            book_node = data.book_node
+            data.book_node = None
+            if book_node is not None:
+                book_node = book_node.get("r", {}).get(feedback_code)
+            data.constraints.append((last_guess, last_feedback, feedback_code))
 
             # 후보가 2개인 경우: 필터링 생략, 방금 단어만 제거
+            filtered_mask = None
             if len(candidates) == 2:
                 filtered_candidates = [w for w in candidates if w != last_guess]
-                self._log(f"[SKIP FILTERING] 2 candidates remain, removed last guess '{last_guess}', remaining: {filtered_candidates}")
+                self._log(f"[SKIP FILTERING] 2 candidates remain, removed last guess '{last_guess}', remaining: {filtered_candidates}", "debug")
             else:
-                filtered_candidates = self.filter_candidates(candidates, last_guess, feedback_code)
+                # 비트셋 인덱스: 피드백 코드 하나가 마스크 AND 몇 번으로 끝난다
+                with self.metrics.span("solver_filter_seconds"):
+                    filtered_mask = data.index.filter(data.candidate_mask, last_guess, feedback_code)
+                    filtered_candidates = data.index.words_of(filtered_mask)
 
             
             # 필터링 결과 검증
             if not filtered_candidates:
-                data["error_count"] += 1
-                self._log(f"ERROR: No matching candidates! Error count: {data['error_count']}")
+                self.metrics.inc("solver_filter_errors_total")
+                # 잘못 해석된 피드백 하나 때문인 경우가 대부분: 그 제약만 고치거나 빼고 다시 계산
+                filtered_mask = self.repair_constraints(data)
+                if filtered_mask:
+                    filtered_candidates = data.index.words_of(filtered_mask)
+                    book_node = None
+
+            if not filtered_candidates:
+                data.error_count += 1
+                self._log(f"ERROR: No matching candidates! Error count: {data.error_count}", "error")
                 
-                if data["error_count"] >= data["max_errors"]:
-                    self._log("Max errors reached, resetting with new starter")
-                    self.reset_with_new_starter(problem_id)
-                    return self.choose_next_guess(problem_id, turn)
+                if data.error_count >= data.max_errors:
+                    self._log("Max errors reached, resetting with new starter", "warning")
+                    self.reset_with_new_starter(data)
+                    return self.choose_next_guess(problem_id, turn, deadline)
                 else:
                     # 덜 엄격한 필터링 시도 또는 원본 후보 사용
                     filtered_candidates = [w for w in candidates if w != last_guess]
+                    filtered_mask = None
 
             
             # 후보 목록 업데이트
-            data["candidate_words"] = filtered_candidates
+            if filtered_mask is None:
+                filtered_mask = data.index.mask_of(filtered_candidates)
+            data.set_candidates(filtered_mask, filtered_candidates)
             
-            self._log(f"After filtering: {len(filtered_candidates)} candidates")
+            self._log(f"After filtering: {len(filtered_candidates)} candidates", "debug")
             if len(filtered_candidates) <= 10:
-                self._log(f"Remaining candidates: {filtered_candidates}")
+                self._log(f"Remaining candidates: {filtered_candidates}", "debug", sample=True)
 
                 if len(filtered_candidates) == 1:
                     guess = filtered_candidates[0]
@@ -473,15 +1075,15 @@ class Solver:
                     self._log(f"[TWO CANDIDATES] Skipping special guess, choosing: {guess}")
                     return guess
                 
-            if self.special_guess(problem_id):
-                    special_guess = self.special_guess(problem_id)
-                    guesses.append(special_guess)
-                    self._log(f"[SPECIAL GUESS] Using special guess: {special_guess}")
-                    return special_guess
-
-            
-            # 다음 추측 선택
-            guess = self.select_best_guess(filtered_candidates)
+            if book_node is not None and book_node["g"] not in guesses:
+                data.book_node = book_node
+                guesses.append(book_node["g"])
+                self._log(f"[BOOK GUESS] {book_node['g']}")
+                return book_node["g"]
+
+            # 다음 추측 선택 (SCORING_STRATEGY)
+            with self.metrics.span("solver_scoring_seconds", strategy=self.strategy.name):
+                guess = self.strategy.choose(self, data, filtered_candidates, deadline)
             
             if guess is None or guess in guesses:
                 # 사용하지 않은 후보 중 선택
@@ -490,70 +1092,175 @@ class Solver:
                         guess = candidate
                         break
                 else:
-                    self._log("All candidates already guessed. Resetting starter.")
-                    self.reset_with_new_starter(problem_id)
-                    return self.choose_next_guess(problem_id, turn)
+                    self._log("All candidates already guessed. Resetting starter.", "warning")
+                    self.reset_with_new_starter(data)
+                    return self.choose_next_guess(problem_id, turn, deadline)
             
             guesses.append(guess)
             self._log(f"Next guess: {guess}")
             return guess
             
+        except problem_state.UnknownProblem:
+            # 재시작 후 다시 고르는 중에 문제가 제거된 경우: 500 대신 410/404 로
+            raise
         except Exception as e:
-            self._log(f"CRITICAL ERROR in choose_next_guess: {e}")
-            self._log(f"Traceback: {traceback.format_exc()}")
+            self._log(f"CRITICAL ERROR in choose_next_guess: {e}", "error")
+            self.metrics.inc("solver_turn_errors_total")
+            self._log(f"Traceback: {traceback.format_exc()}", "error")
             
-            data["error_count"] += 1
-            self.reset_with_new_starter(problem_id)
-            return self.choose_next_guess(problem_id, turn)
+            data.error_count += 1
+            self.reset_with_new_starter(data)
+            return self.choose_next_guess(problem_id, turn, deadline)
 
 
 solver = Solver()
 
 class StudentHandler(BaseHTTPRequestHandler):
+    router = None  # SERVER_MODE=prefork 의 공개 포트에서는 prefork.Router (owner 워커로 전달)
+
     def log_message(self, format, *args):
         pass
-        
+
+    def _send(self, status, body=b"", content_type=None):
+        # 상태줄/헤더/본문을 write 한 번으로 (keep-alive(HTTP/1.1) 연결에서는 모든 응답에 Content-Length 가 필요)
+        self.wfile.write(request_io.response(self.protocol_version, status, body, content_type))
+
+    def _forward(self, problem_id, body):
+        """prefork 모드에서 problem_id 를 다른 워커가 맡고 있으면 요청을 그대로 전달하고 True"""
+        if self.router is None or self.router.is_local(problem_id):
+            return False
+        status, payload, content_type = self.router.forward(self.router.owner(problem_id), self.path, bytes(body))
+        self._send(status, payload, content_type)
+        return True
+
+    def _endpoint(self):
+        # 메트릭 label 용 (알 수 없는 경로는 하나로 묶음)
+        return self.path if self.path in ("/start_problem", "/guess", "/guess_batch", "/end_problem", "/warm_up") else "other"
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = solver.metrics_text().encode()
+            self._send(200, body, "text/plain; version=0.0.4")
+        else:
+            self._send(404)
+
     def do_POST(self):
+        start = time.perf_counter()
         try:
-            length = int(self.headers.get("Content-Length"))
-            data = json.loads(self.rfile.read(length))
+            length = int(self.headers.get("Content-Length") or 0)
+            body = request_io.read_body(self.rfile, length)
 
             if self.path == "/start_problem":
+                # candidate_words 대신 이전 응답의 words_key (또는 목록 이름) 만 보내도 된다
+                # 이미 받은 적 있는 candidate_words 배열은 파싱하지 않고 등록된 목록을 쓴다
+                # prefork 에서 다른 워커 몫이면 단어 배열은 파싱하지 않고 problem_id 만 보고 전달
+                if self.router is not None and self._forward(request_io.loads_without_words(body)["problem_id"], body):
+                    return
+                data, digest = solver.word_arrays.decode_start_problem(body)
                 problem_id = data["problem_id"]
-                candidates = data["candidate_words"]
-                solver.start_problem(problem_id, candidates)
-                self.send_response(200)
-                self.end_headers()
+                candidates = data.get("candidate_words")
+                try:
+                    with solver.problem_lock(problem_id, create=True):
+                        key = solver.start_problem(problem_id, candidates, data.get("words_key"))
+                except Exception:
+                    solver.discard_problem_lock(problem_id)
+                    raise
+                solver.word_arrays.remember(digest, key)
+                self._send(200, request_io.words_key_body(key), request_io.JSON)
                 return
 
-            elif self.path == "/guess":
+            data = request_io.loads(body)
+            if self.path == "/guess":
                 problem_id = data["problem_id"]
+                if self._forward(problem_id, body):
+                    return
                 feedback = data.get("verbal_feedback")
                 turn = data["turn"]
 
-                solver.add_feedback(problem_id, feedback)
-                guess = solver.choose_next_guess(problem_id, turn)
+                with solver.problem_lock(problem_id):
+                    solver.add_feedback(problem_id, feedback)
+                    guess = solver.choose_next_guess(problem_id, turn)
 
-                self.send_response(200)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"guess": guess}).encode())
+                self._send(200, request_io.guess_body(guess), request_io.JSON)
+                return
+
+            elif self.path == "/guess_batch":
+                # {"items": [{problem_id, verbal_feedback, turn}, ...]} -> {"guesses": [{problem_id, guess 또는 error}, ...]}
+                if self.router is not None:
+                    results = self.router.guess_batch(data["items"], solver.guess_batch)
+                else:
+                    results = solver.guess_batch(data["items"])
+                self._send(200, json.dumps({"guesses": results}).encode(), "application/json")
+                return
+
+            elif self.path == "/warm_up":
+                # 첫 문제 전에 단어 목록/엔진 (그리고 {"llm": true} 면 Cortex 세션) 을 미리 준비
+                timings = solver.warm_up(llm=bool(data.get("llm")))
+                self._send(200, json.dumps({"timings": timings}).encode(), "application/json")
+                return
+
+            elif self.path == "/end_problem":
+                problem_id = data["problem_id"]
+                if self._forward(problem_id, body):
+                    return
+                with solver.problem_lock(problem_id):
+                    solver.end_problem(problem_id)
+                self._send(200)
                 return
 
             else:
-                self.send_response(404)
-                self.end_headers()
-                
+                self._send(404)
+
+        except problem_state.UnknownWordList as e:
+            # 등록되지 않은 목록: 클라이언트가 candidate_words 전체로 다시 요청
+            solver.metrics.inc("solver_word_list_misses_total")
+            self._send(409, json.dumps({"error": str(e), "words_key": e.words_key}).encode(), "application/json")
+        except problem_state.UnknownProblem as e:
+            # 제거된 문제는 410, 처음부터 없던 문제는 404 (500 대신 이유를 알려준다)
+            solver._log(f"HTTP {self.path}: {e}", "warning")
+            solver.metrics.inc("solver_unknown_problem_total", endpoint=self._endpoint())
+            self._send(410 if e.evicted_reason else 404, json.dumps({"error": str(e)}).encode(), "application/json")
         except Exception as e:
-            solver._log(f"HTTP ERROR: {e}")
-            solver._log(f"Traceback: {traceback.format_exc()}")
-            self.send_response(500)
-            self.end_headers()
+            solver._log(f"HTTP ERROR: {e}", "error")
+            solver._log(f"Traceback: {traceback.format_exc()}", "error")
+            solver.metrics.inc("solver_http_errors_total", endpoint=self._endpoint())
+            self._send(500)
+        finally:
+            solver.metrics.observe("solver_request_seconds", time.perf_counter() - start, endpoint=self._endpoint())
+
+
+class KeepAliveStudentHandler(StudentHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 30  # 유휴 keep-alive 연결 정리
+    # 응답이 짧은 패킷 하나라 Nagle + delayed ACK 로 ~40ms 가 붙지 않게 한다
+    disable_nagle_algorithm = True
+
 
 def run():
     port = int(os.environ.get("PORT", 8000))
-    server = HTTPServer(("0.0.0.0", port), StudentHandler)
-    print(f"Student server running on port {port}…")
+    mode = os.environ.get("SERVER_MODE", "single").lower()
+    lazy = os.environ.get("STARTUP_MODE", "eager").lower() == "lazy"
+    if mode == "prefork":
+        # SERVER_MODE=prefork : SERVER_WORKERS 개 프로세스가 SO_REUSEPORT 로 같은 포트를 듣는다 (prefork.py)
+        # 공유할 단어 목록/행렬은 항상 fork 전에 준비하고, Cortex 세션은 워커마다 (eager 면 시작할 때) 연다
+        prefork.serve(KeepAliveStudentHandler, solver, port,
+                      workers=int(os.environ.get("SERVER_WORKERS") or os.cpu_count() or 1),
+                      internal_base=int(os.environ.get("PREFORK_INTERNAL_PORT", 0)) or None,
+                      llm=not lazy)
+        return
+    # STARTUP_MODE=lazy : 바로 listen 하고 첫 /start_problem (또는 /warm_up) 에서 준비
+    if not lazy:
+        try:
+            print(f"[LOG] Warm-up: {solver.warm_up(llm=True)}")
+        except Exception as e:
+            # Snowflake 에 연결할 수 없어도 규칙 기반 해석으로 서비스는 시작한다
+            print(f"[LOG] Warm-up failed ({e}), continuing")
+    # SERVER_MODE=threaded : 요청마다 스레드, keep-alive 지원, 문제별 Lock 으로 격리
+    if mode == "threaded":
+        server = ThreadingHTTPServer(("0.0.0.0", port), KeepAliveStudentHandler)
+    else:
+        server = HTTPServer(("0.0.0.0", port), StudentHandler)
+    print(f"Student server running on port {port} ({mode})…")
     server.serve_forever()
 
 if __name__ == "__main__":
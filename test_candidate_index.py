@@ -0,0 +1,49 @@
+"""CandidateIndex.constraint_mask / feedback_matrix.compute_patterns 가 compute_actual_feedback 과 같은지 확인"""
+import os
+import random
+from itertools import product
+
+import pytest
+
+import candidate_index
+import feedback_matrix
+import team19
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 중복 글자가 있는 추측/정답 (노랑은 남은 개수만큼, 0 뒤에 1 이 올 수 없는 경우 등)
+DUPLICATES = ["speed", "erase", "geese", "eerie", "llama", "abbey", "array", "sassy",
+              "mamma", "boost", "robot", "otter", "tatty", "knoll", "level", "eaten"]
+ALL_CODES = ["".join(digits) for digits in product("012", repeat=5)]
+
+
+@pytest.fixture(scope="module")
+def words():
+    all_words = team19.load_word_list(os.path.join(HERE, "words.txt"))
+    sample = random.Random(0).sample(all_words, 300)
+    return DUPLICATES + [w for w in sample if w not in DUPLICATES]
+
+
+def feedback(secret, guess):
+    return team19.solver.compute_actual_feedback(secret, guess)
+
+
+def test_constraint_mask_matches_feedback(words):
+    index = candidate_index.CandidateIndex(words)
+    guesses = DUPLICATES + words[len(DUPLICATES):len(DUPLICATES) + 24]
+    for guess in guesses:
+        expected = {code: [] for code in ALL_CODES}
+        for word in words:
+            expected[feedback(word, guess)].append(word)
+        for code in ALL_CODES:
+            # 불가능한 코드 (예: 같은 글자의 0 뒤에 1) 는 빈 목록이어야 한다
+            assert index.words_of(index.constraint_mask(guess, code)) == expected[code], (guess, code)
+
+
+@pytest.mark.skipif(not feedback_matrix.available(), reason="numpy not installed")
+def test_compute_patterns_matches_feedback(words):
+    codes = feedback_matrix.encode_words(words)
+    patterns = feedback_matrix.compute_patterns(codes, codes)
+    for g, guess in enumerate(words):
+        for s, secret in enumerate(words):
+            assert feedback_matrix.int_to_code(int(patterns[g, s])) == feedback(secret, guess), (guess, secret)